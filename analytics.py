@@ -0,0 +1,209 @@
+"""Aggregate statistics over the candidate store.
+
+    python analytics.py --since 2024-06-01
+    python analytics.py --tech kubernetes --json
+
+The store is scanned memory-mapped in byte ranges of each segment, one
+range per task in a process pool, so memory stays flat regardless of the
+store size. Compressed segments (see compaction.py) are one task each and
+are decompressed block by block.
+"""
+from __future__ import annotations
+import argparse
+import json
+import mmap
+import os
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import storage
+from nlp import backfill_transcript_language
+from sentiment import backfill_transcript
+from techstack import canonicalize
+from utils import normalize_profile, parse_tech_stack, parse_years
+
+PROFILE_FIELDS = ("full_name", "email", "phone", "desired_positions", "years_of_experience", "current_location", "tech_stack")
+YOE_BUCKETS = ((0, "0-1"), (1, "1-3"), (3, "3-5"), (5, "5-10"), (10, "10+"))
+CHUNK_BYTES = 16 * 1024 * 1024
+_QUESTION_RE = re.compile(r"^Q(\d+):")
+
+Task = Tuple[str, int, int, Dict[str, Any]]
+
+
+def yoe_bucket(years: Any) -> str:
+    years = parse_years(years)
+    if years is None:
+        return "unknown"
+    label = YOE_BUCKETS[0][1]
+    for lower, name in YOE_BUCKETS:
+        if years >= lower:
+            label = name
+    return label
+
+
+def empty_totals() -> Dict[str, Any]:
+    return {
+        "records": 0,
+        "skipped": 0,
+        "profile_complete": 0,
+        "interview_complete": 0,
+        "tech": Counter(),
+        "yoe": Counter(),
+        "sentiment_by_role": defaultdict(Counter),
+        "answer_language": Counter(),
+    }
+
+
+def add_record(totals: Dict[str, Any], rec: Dict[str, Any], opts: Dict[str, Any]) -> None:
+    ts = rec.get("timestamp") or ""
+    if (opts.get("since") and ts < opts["since"]) or (opts.get("until") and ts >= opts["until"]):
+        return
+    profile = normalize_profile(rec.get("profile") or {})
+    techs = set(parse_tech_stack(str(profile.get("tech_stack") or "")))
+    if opts.get("tech") and opts["tech"] not in techs:
+        return
+    totals["records"] += 1
+    totals["tech"].update(techs)
+    totals["yoe"][yoe_bucket(profile.get("years_of_experience"))] += 1
+    if all(profile.get(k) for k in PROFILE_FIELDS):
+        totals["profile_complete"] += 1
+    transcript = rec.get("transcript") or []
+    if opts.get("backfill_sentiment"):
+        backfill_transcript(transcript, opts["backfill_sentiment"])
+    if opts.get("backfill_language"):
+        backfill_transcript_language(transcript)
+    asked = 0
+    role = str(profile.get("desired_positions") or "unknown").lower()
+    for m in transcript:
+        if m.get("role") == "assistant":
+            q = _QUESTION_RE.match(m.get("content") or "")
+            if q:
+                asked = max(asked, int(q.group(1)))
+        else:
+            if m.get("sentiment"):
+                totals["sentiment_by_role"][role][m["sentiment"]] += 1
+            if m.get("lang"):
+                totals["answer_language"][m["lang"]] += 1
+    if asked >= 5:
+        totals["interview_complete"] += 1
+
+
+def scan_range(task: Task) -> Dict[str, Any]:
+    """Aggregate every record whose line starts in [start, end) of `path`."""
+    path, start, end, opts = task
+    totals = empty_totals()
+    if storage.is_compressed(path):
+        for _, _, line in storage.iter_records(path):
+            _add_line(totals, line, opts)
+        return totals
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        pos = 0 if start == 0 else mm.find(b"\n", start - 1) + 1
+        if start > 0 and pos == 0:
+            return totals  # no line starts inside this range
+        while pos < end:
+            nl = mm.find(b"\n", pos)
+            if nl == -1:
+                nl = size
+            _add_line(totals, mm[pos:nl], opts)
+            pos = nl + 1
+    return totals
+
+
+def _add_line(totals: Dict[str, Any], line: bytes, opts: Dict[str, Any]) -> None:
+    if line.strip():
+        try:
+            add_record(totals, json.loads(line), opts)
+        except Exception:
+            totals["skipped"] += 1
+
+
+def merge(into: Dict[str, Any], part: Dict[str, Any]) -> None:
+    for k in ("records", "skipped", "profile_complete", "interview_complete"):
+        into[k] += part[k]
+    into["tech"].update(part["tech"])
+    into["yoe"].update(part["yoe"])
+    into["answer_language"].update(part["answer_language"])
+    for role, c in part["sentiment_by_role"].items():
+        into["sentiment_by_role"][role].update(c)
+
+
+def plan_tasks(paths: List[str], opts: Dict[str, Any], chunk_bytes: int = CHUNK_BYTES) -> List[Task]:
+    tasks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if storage.is_compressed(path):
+            tasks.append((path, 0, size, opts))
+            continue
+        for start in range(0, size, chunk_bytes):
+            tasks.append((path, start, min(start + chunk_bytes, size), opts))
+    return tasks
+
+
+def run(paths: List[str], opts: Dict[str, Any], workers: int | None = None) -> Dict[str, Any]:
+    totals = empty_totals()
+    tasks = plan_tasks(paths, opts)
+    if len(tasks) <= 1 or workers == 1:
+        for part in map(scan_range, tasks):
+            merge(totals, part)
+        return totals
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(scan_range, tasks):
+            merge(totals, part)
+    return totals
+
+
+def report(totals: Dict[str, Any], top: int = 15) -> Dict[str, Any]:
+    n = totals["records"]
+    return {
+        "records": n,
+        "skipped_lines": totals["skipped"],
+        "profile_completion_rate": totals["profile_complete"] / n if n else 0.0,
+        "interview_completion_rate": totals["interview_complete"] / n if n else 0.0,
+        "top_tech": totals["tech"].most_common(top),
+        "years_of_experience": {label: totals["yoe"][label] for _, label in YOE_BUCKETS + ((None, "unknown"),)},
+        "sentiment_by_role": {role: dict(c) for role, c in sorted(totals["sentiment_by_role"].items())},
+        "answer_language": dict(totals["answer_language"].most_common()),
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Aggregate statistics over the candidate store.")
+    ap.add_argument("paths", nargs="*", help="segment files (default: the whole store)")
+    ap.add_argument("--since", help="only records on/after this ISO date, e.g. 2024-06-01")
+    ap.add_argument("--until", help="only records before this ISO date")
+    ap.add_argument("--tech", help="only candidates listing this technology")
+    ap.add_argument("--backfill-sentiment", choices=("rules", "vader"), help="label user messages stored without a sentiment")
+    ap.add_argument("--backfill-language", action="store_true", help="detect the language of user messages stored without one")
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args(argv)
+
+    opts = {"since": args.since, "until": args.until, "tech": canonicalize(args.tech) if args.tech else None,
+            "backfill_sentiment": args.backfill_sentiment, "backfill_language": args.backfill_language}
+    paths = [p for p in (args.paths or storage.segment_paths()) if os.path.getsize(p) > 0]
+    out = report(run(paths, opts, args.workers), args.top)
+    if args.json:
+        print(json.dumps(out, indent=2, ensure_ascii=False))
+        return
+    print(f"Candidates: {out['records']}  (skipped lines: {out['skipped_lines']})")
+    print(f"Profile completion: {out['profile_completion_rate']:.1%}  Interview completion: {out['interview_completion_rate']:.1%}")
+    print("Top technologies:")
+    for tech, count in out["top_tech"]:
+        print(f"  {tech:<24} {count}")
+    print("Years of experience:")
+    for label, count in out["years_of_experience"].items():
+        print(f"  {label:<8} {count}")
+    if out["sentiment_by_role"]:
+        print("Sentiment by role:")
+        for role, mix in out["sentiment_by_role"].items():
+            print(f"  {role:<24} " + ", ".join(f"{k}={v}" for k, v in sorted(mix.items())))
+    if out["answer_language"]:
+        print("Answer language: " + ", ".join(f"{k}={v}" for k, v in out["answer_language"].items()))
+
+
+if __name__ == "__main__":
+    main()
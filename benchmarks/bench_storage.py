@@ -0,0 +1,84 @@
+"""Returning-candidate lookup: indexed seek vs. the old reverse scan.
+
+    python benchmarks/bench_storage.py --records 1000000
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+
+
+def write_synthetic_store(n: int, seed: int = 0) -> list[str]:
+    """Writes `n` records straight to storage.DATA_PATH; returns the hashed emails used."""
+    rng = random.Random(seed)
+    emails = [storage.hash_email(f"candidate{i}@example.com") for i in range(max(1, n // 2))]
+    with open(storage.DATA_PATH, "w", encoding="utf-8") as f:
+        for i in range(n):
+            hashed = rng.choice(emails)
+            record = {
+                "session_id": f"s{i}",
+                "timestamp": "2024-01-01T00:00:00Z",
+                "hashed_email": hashed,
+                "profile": {"full_name": f"Candidate {i}", "years_of_experience": str(rng.randint(0, 20)), "tech_stack": "Python, SQL"},
+                "transcript": [{"role": "user", "content": "hello"}],
+            }
+            f.write(json.dumps(record) + "\n")
+    return emails
+
+
+def scan_last_profile(hashed_email: str):
+    """The pre-index implementation, kept for comparison."""
+    with open(storage.DATA_PATH, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    for line in reversed(lines):
+        obj = json.loads(line)
+        if obj.get("hashed_email") == hashed_email:
+            return obj.get("profile")
+    return None
+
+
+def timed(fn, args_list) -> float:
+    start = time.perf_counter()
+    for a in args_list:
+        fn(a)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1_000_000)
+    ap.add_argument("--lookups", type=int, default=1000)
+    ap.add_argument("--scan-lookups", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.DATA_PATH = os.path.join(tmp, "candidates.jsonl")
+        storage.INDEX_PATH = os.path.join(tmp, "candidates.idx.sqlite3")
+        t = time.perf_counter()
+        emails = write_synthetic_store(args.records)
+        print(f"wrote {args.records:,} records in {time.perf_counter() - t:.1f}s "
+              f"({os.path.getsize(storage.DATA_PATH) / 1e6:.0f} MB)")
+
+        t = time.perf_counter()
+        storage.rebuild_index()
+        print(f"rebuild_index: {time.perf_counter() - t:.2f}s")
+
+        rng = random.Random(1)
+        sample = [rng.choice(emails) for _ in range(args.lookups)]
+        per = timed(storage.load_last_profile, sample)
+        print(f"load_last_profile (indexed): {per * 1e6:.0f} us/lookup")
+
+        per = timed(scan_last_profile, sample[:args.scan_lookups])
+        print(f"reverse scan (old):          {per * 1e6:.0f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Microbenchmarks for the interview hot paths, checked against a stored baseline.
+
+    python benchmarks/run.py                    # run and compare with baseline.json
+    python benchmarks/run.py --save-baseline    # record a new baseline (on the deploy host)
+    python benchmarks/run.py --filter storage --sizes 1000,1000000
+
+Each benchmark reports the best-of-N time per operation with fixed seeds
+and inputs. Before every repeat a fixed pure-Python calibration loop is
+timed too, and its best time is stored next to the result: the baseline is
+scaled up by how much slower the calibration ran in this run, so a loaded
+or throttled host does not read as a regression. --save-baseline keeps the
+best of --rounds runs of the whole suite.
+
+A benchmark is flagged when it is slower than the scaled baseline by more
+than its tolerance and by more than --floor microseconds. The tolerance is
+--tolerance, widened for noisy benchmarks to SPREAD_FACTOR times their
+spread (interquartile range over median of the repeats, in this run or the
+baseline's). Flagged benchmarks are measured again, up to --retries times,
+and only fail the run, exiting non-zero, if every measurement is slow.
+Benchmarks whose optional dependency (langdetect, vaderSentiment) is
+missing are skipped.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["QUESTION_CACHE"] = "0"  # keep question generation off the disk cache
+
+import nlp  # noqa: E402
+import question_bank  # noqa: E402
+import questions  # noqa: E402
+import search  # noqa: E402
+import sentiment  # noqa: E402
+import storage  # noqa: E402
+import techstack  # noqa: E402
+import utils  # noqa: E402
+from bench_storage import write_synthetic_store  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+Bench = Tuple[str, Callable[[], object], int]
+# (seconds per op, seconds per calibration loop), both best-of-N, and the spread of the op times
+Timing = Tuple[float, float, float]
+CALIBRATION_NUMBER = 10
+SPREAD_FACTOR = 2.0
+
+SAMPLE_ANSWERS = [
+    "Yes, I'm confident with Python and I enjoy building APIs.",
+    "I don't know much about Kubernetes, honestly.",
+    "I have 5 years of experience.",
+    "Not really, but I'm excited to learn.",
+]
+SAMPLE_PROFILE = {
+    "full_name": " Jane Doe ", "email": "jane@example.com", "phone": "+1 555 0100",
+    "desired_positions": "Backend Engineer", "years_of_experience": "5,5",
+    "current_location": "Berlin", "tech_stack": "Python, Django / PostgreSQL and Docker + React Native",
+}
+
+
+def _stub_llm() -> Callable:
+    counter = iter(range(10 ** 9))
+
+    def complete(messages, model=None, max_tokens=None, **kw):
+        n = next(counter)
+        return f"What does feature {n} do?\nHow would you test module {n}?\nExplain pattern {n}."
+    return complete
+
+
+def synthetic_search_index(n: int, seed: int = 0) -> search.SearchIndex:
+    """Postings for `n` candidates with independent terms at fixed frequencies (no store behind it)."""
+    rng = random.Random(seed)
+    index = search.SearchIndex()
+    index.keys = [""] * n
+    for term, share in (("tech:python", 0.3), ("tech:react", 0.2), ("tech:rust", 0.02), ("role:engineer", 0.6)):
+        chunks = {}
+        for hi in range((n + 0xFFFF) >> 16):
+            size = min(65536, n - (hi << 16))
+            chunks[hi] = search._from_bitmap(search._to_bitmap(rng.sample(range(size), int(size * share))))
+        index.postings[index._term_id(term)] = search.Postings(chunks)
+    return index
+
+
+def core_benchmarks() -> List[Bench]:
+    random.seed(0)
+    stub = _stub_llm()
+    asked = ["How do you handle debugging in Python?", "What is a Python decorator?"]
+    benches: List[Bench] = [
+        ("questions.generate_unique_question[stub]",
+         lambda: questions.generate_unique_question("Python, SQL, React", asked, "English", "stub", stub), 2000),
+        ("question_bank.pick",
+         lambda: question_bank.get_question_bank().pick(["Python", "SQL", "React"], "English", "mid", asked), 20000),
+        ("questions.generate_local_fallback_question",
+         lambda: questions.generate_local_fallback_question(["Python", "SQL", "React"]), 20000),
+        ("sentiment.analyze_sentiment[rules]",
+         lambda: [sentiment.analyze_sentiment(t) for t in SAMPLE_ANSWERS], 5000),
+        ("nlp.detect_language_input",
+         lambda: [nlp.detect_language_input(t) for t in ("English please", "español", "हिंदी", "no idea")], 20000),
+        ("nlp.detect_language_code[fast path]",
+         lambda: [nlp._detect_code.__wrapped__(t) for t in SAMPLE_ANSWERS + ["yes", "5 years", "हाँ"]], 5000),
+        ("techstack.parse_stack[cold]",
+         lambda: techstack.parse_stack.__wrapped__(SAMPLE_PROFILE["tech_stack"]), 20000),
+        ("utils.parse_tech_stack",
+         lambda: utils.parse_tech_stack(SAMPLE_PROFILE["tech_stack"]), 20000),
+        ("utils.normalize_profile",
+         lambda: utils.normalize_profile(SAMPLE_PROFILE), 20000),
+    ]
+    try:
+        sentiment.warm_up()
+        vader = sentiment.analyze_sentiment_vader.__wrapped__  # bypass the memo: measure the model
+        benches.append(("nlp.analyze_sentiment[vader]", lambda: [vader(t) for t in SAMPLE_ANSWERS], 500))
+    except ImportError:
+        print("skip nlp.analyze_sentiment[vader]: vaderSentiment not installed")
+    try:
+        nlp._get_detector()
+        langdetect = nlp._get_detector()
+        benches.append(("nlp.detect_language_code[langdetect]",
+                        lambda: [langdetect(t) for t in SAMPLE_ANSWERS], 200))
+    except ImportError:
+        print("skip nlp.detect_language_code[langdetect]: langdetect not installed")
+    index = synthetic_search_index(1_000_000)
+    benches.append(("search.query[1000000]",
+                    lambda: index.query(tech=["Python", "React"], not_tech=["Rust"], role="engineer"), 200))
+    return benches
+
+
+def calibration_loop() -> int:
+    """A fixed mix of the dict, string and call work the benchmarks do."""
+    d = {}
+    for i in range(500):
+        d[f"k{i}"] = i * 3
+    return sum(len(k) for k, v in d.items() if v % 7)
+
+
+def spread(samples: List[float]) -> float:
+    """Interquartile range over median: how far apart the repeats of one benchmark land."""
+    if len(samples) < 4:
+        return (max(samples) - min(samples)) / statistics.median(samples)
+    q1, q2, q3 = statistics.quantiles(samples, n=4)
+    return (q3 - q1) / q2
+
+
+def measure(fn: Callable[[], object], number: int, repeat: int, ops: int = 1) -> Timing:
+    """Best-of-`repeat` seconds per op of `fn` (run `number` times, doing `ops` ops each),
+    the best calibration time, taken right before each repeat, and the spread of the repeats."""
+    calibration = float("inf")
+    samples = []
+    for _ in range(repeat):
+        calibration = min(calibration, timeit.timeit(calibration_loop, number=CALIBRATION_NUMBER) / CALIBRATION_NUMBER)
+        samples.append(timeit.timeit(fn, number=number) / number / ops)
+    return min(samples), calibration, spread(samples)
+
+
+def merge(results: Dict[str, Timing], run: Dict[str, Timing]) -> None:
+    """Fold another measurement into `results`, keeping the fastest time, calibration and spread
+    (a re-measurement must not loosen the gate by happening to be noisier)."""
+    for name, (value, cal, spr) in run.items():
+        old = results.get(name)
+        results[name] = (min(old[0], value), min(old[1], cal), min(old[2], spr)) if old else (value, cal, spr)
+
+
+def storage_benchmarks(sizes: List[int], repeat: int) -> Dict[str, Timing]:
+    results: Dict[str, Timing] = {}
+    saved = storage.DATA_PATH, storage.INDEX_PATH
+    try:
+        for n in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                storage.DATA_PATH = os.path.join(tmp, "candidates.jsonl")
+                storage.INDEX_PATH = os.path.join(tmp, "candidates.idx.sqlite3")
+                emails = write_synthetic_store(n)
+                storage.rebuild_index()
+                rng = random.Random(n)
+                sample = [rng.choice(emails) for _ in range(200)]
+                results[f"storage.load_last_profile[{n}]"] = measure(
+                    lambda: [storage.load_last_profile(e) for e in sample], 1, repeat, ops=len(sample))
+
+                profile = dict(SAMPLE_PROFILE)
+                transcript = [{"role": "user", "content": t} for t in SAMPLE_ANSWERS]
+
+                def persist_batch():
+                    for i in range(200):
+                        storage.persist_candidate(f"bench-{i}", profile, transcript)
+                    storage.flush()
+                results[f"storage.persist_candidate[{n}]"] = measure(persist_batch, 1, repeat, ops=200)
+    finally:
+        storage.DATA_PATH, storage.INDEX_PATH = saved
+    return results
+
+
+def compare(results: Dict[str, Timing], baseline: Dict[str, Dict[str, float]], tolerance: float,
+            floor: float) -> List[str]:
+    """Print each result against its baseline scaled by the calibration ratio; returns the regressions."""
+    regressions = []
+    print(f"{'benchmark':<46} {'per op':>12} {'baseline':>12} {'host':>7} {'spread':>7} {'ratio':>7}")
+    for name, (value, cal, spr) in results.items():
+        base = baseline.get("results", {}).get(name)
+        base_cal = baseline.get("calibration", {}).get(name)
+        # Only ever loosen: a calibration that happened to run fast must not tighten the gate.
+        host = max(1.0, cal / base_cal) if base and base_cal else 1.0
+        expected = base * host if base else None
+        ratio = value / expected if expected else None
+        noise = max(spr, baseline.get("spread", {}).get(name, 0.0))
+        flag = ""
+        if expected and value > expected * (1 + max(tolerance, SPREAD_FACTOR * noise)) and value - expected > floor:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        base_s = f"{base * 1e6:10.2f}us" if base else f"{'-':>12}"
+        ratio_s = f"{ratio:6.2f}x" if ratio is not None else f"{'-':>7}"
+        print(f"{name:<46} {value * 1e6:10.2f}us {base_s} {host:6.2f}x {noise:6.0%} {ratio_s}{flag}")
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    ap.add_argument("--sizes", default="1000,10000,100000", help="store sizes for storage benchmarks, e.g. 1000,1000000")
+    ap.add_argument("--repeat", type=int, default=9)
+    ap.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown vs baseline (0.5 = 50%%)")
+    ap.add_argument("--floor", type=float, default=2.0, help="slowdowns under this many microseconds never count")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--rounds", type=int, default=None, help="runs of the suite to keep the best of (default 3 when saving)")
+    ap.add_argument("--retries", type=int, default=2, help="re-measurements of a flagged benchmark before it fails")
+    args = ap.parse_args()
+    rounds = args.rounds or (3 if args.save_baseline else 1)
+
+    # name -> callable measuring it (a storage size measures both of its benchmarks)
+    runners: Dict[str, Callable[[], Dict[str, Timing]]] = {}
+    for name, fn, number in core_benchmarks():
+        if args.filter in name:
+            runners[name] = lambda name=name, fn=fn, number=number: {name: measure(fn, number, args.repeat)}
+    for n in [int(s) for s in args.sizes.split(",") if s]:
+        for name in (f"storage.load_last_profile[{n}]", f"storage.persist_candidate[{n}]"):
+            if args.filter in name:
+                runners[name] = lambda n=n: {k: v for k, v in storage_benchmarks([n], max(1, args.repeat // 2)).items()
+                                             if args.filter in k}
+
+    def run(names: List[str]) -> Dict[str, Timing]:
+        out: Dict[str, Timing] = {}
+        for name in names:
+            if name not in out:
+                out.update(runners[name]())
+        return out
+
+    results: Dict[str, Timing] = {}
+    for _ in range(rounds):
+        merge(results, run(list(runners)))
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.setdefault("results", {}).update({k: v for k, (v, _, _) in results.items()})
+        baseline.setdefault("calibration", {}).update({k: c for k, (_, c, _) in results.items()})
+        baseline.setdefault("spread", {}).update({k: round(spr, 4) for k, (_, _, spr) in results.items()})
+        baseline["environment"] = {"python": platform.python_version(), "platform": platform.platform()}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"saved {len(results)} results to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.floor / 1e6)
+    for attempt in range(args.retries):
+        if not regressions:
+            break
+        # A real regression is slow every time; noise rarely hits the same benchmark twice.
+        print(f"re-measuring {len(regressions)} flagged benchmark(s), attempt {attempt + 1} of {args.retries}")
+        merge(results, run(regressions))
+        regressions = compare({k: results[k] for k in regressions}, baseline, args.tolerance, args.floor / 1e6)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Cold-start report: import time per module and cost of each warm-up step.
+
+Every measurement runs in a fresh interpreter (``python -X importtime``) so
+module caches from earlier measurements do not hide anything.
+
+    python benchmarks/startup_timing.py
+"""
+from __future__ import annotations
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_MODULES = [
+    "ui_assets", "utils", "prompts", "metrics", "resilience", "sentiment", "dedupe", "techstack", "storage", "journal",
+    "compaction", "question_bank", "question_cache", "questions", "endpoints", "llm_client", "grading", "session",
+    "nlp", "warmup",
+]
+THIRD_PARTY = ["streamlit", "openai", "httpx", "dotenv", "langdetect", "vaderSentiment"]
+WARM_UPS = {
+    "llm_client.warm_up": "import llm_client; llm_client.warm_up()",
+    "nlp.warm_up": "import nlp; nlp.warm_up()",
+    "question_cache": "from question_cache import get_question_cache; get_question_cache()",
+    "question_bank": "from question_bank import get_question_bank; get_question_bank()",
+}
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_time_ms(module: str) -> float | None:
+    """Cumulative import time of `module` in a fresh interpreter, or None if it fails."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if m and m.group(4) == module and len(m.group(3)) == 1:
+            return int(m.group(2)) / 1000
+    return None
+
+
+def run_time_ms(code: str) -> float | None:
+    timed = f"import time; _t = time.perf_counter(); {code}; print((time.perf_counter() - _t) * 1000)"
+    proc = subprocess.run([sys.executable, "-c", timed], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    def row(name: str, ms: float | None) -> None:
+        print(f"  {name:<22} {'unavailable' if ms is None else f'{ms:9.1f} ms'}")
+
+    print("Import time (cumulative, fresh interpreter):")
+    for mod in APP_MODULES + THIRD_PARTY:
+        row(mod, import_time_ms(mod))
+    print("Warm-up steps (import + initialisation):")
+    for name, code in WARM_UPS.items():
+        row(name, run_time_ms(code))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Compaction of the candidate store into compressed segments.
+
+    python compaction.py                    # compact what is due, then exit
+    python compaction.py --keep-history 2   # keep two older records per candidate
+
+A sealed segment (any but the one the writer appends to, untouched for
+STORAGE_COMPACT_MIN_AGE seconds) is rewritten as a sequence of gzip blocks
+of about BLOCK_BYTES each, keeping each candidate's latest record plus
+STORAGE_KEEP_HISTORY older ones; records without an email are kept. A
+compressed segment is rewritten again once STORAGE_COMPACT_GARBAGE of its
+records have been superseded. The result is still a valid .gz file.
+
+Segments are compacted one at a time, outside any index transaction: the
+index is only locked for the swap, which repoints that segment's rows at
+their new block offsets. The writer never touches sealed segments, so it is
+never blocked, and readers (`storage.load_last_profile`, analytics) go
+through the index or `storage.iter_records` and see either version.
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import os
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Optional, Set
+
+import storage
+
+KEEP_HISTORY = int(os.getenv("STORAGE_KEEP_HISTORY", "0"))
+MIN_AGE = float(os.getenv("STORAGE_COMPACT_MIN_AGE", "60"))
+GARBAGE_RATIO = float(os.getenv("STORAGE_COMPACT_GARBAGE", "0.5"))
+INTERVAL = float(os.getenv("STORAGE_COMPACT_INTERVAL", "600"))  # 0 disables the background thread
+BLOCK_BYTES = 64 * 1024
+BLOCK_RECORDS = 4096  # item numbers must fit the low 12 bits of a record's seq
+
+_RANKED = """
+    SELECT seq, segment, ROW_NUMBER() OVER (PARTITION BY hashed_email ORDER BY seq DESC) AS rn
+    FROM records {where}
+"""
+
+_stats = {"runs": 0, "segments": 0, "records_in": 0, "records_out": 0, "bytes_in": 0, "bytes_out": 0, "errors": 0}
+_stats_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+
+def _dead_seqs(conn, name: str, keep_history: int) -> Set[int]:
+    """Records of segment `name` superseded by more than `keep_history` newer ones."""
+    where = "WHERE hashed_email IN (SELECT hashed_email FROM records WHERE segment = ?)"
+    rows = conn.execute(f"SELECT seq FROM ({_RANKED.format(where=where)}) WHERE segment = ? AND rn > ?",
+                        (name, name, keep_history + 1))
+    return {seq for (seq,) in rows}
+
+
+def plan(keep_history: int = KEEP_HISTORY, min_age: float = MIN_AGE, garbage_ratio: float = GARBAGE_RATIO) -> List[str]:
+    """Segments due for compaction, oldest first."""
+    segments = storage.segment_paths()
+    now = time.time()
+    due = [p for p in segments[:-1] if not storage.is_compressed(p) and now - os.path.getmtime(p) >= min_age]
+    compressed = {os.path.basename(p): p for p in segments if storage.is_compressed(p)}
+    if compressed:
+        with closing(storage.open_index()) as conn:
+            rows = conn.execute(f"SELECT segment, SUM(rn > ?), COUNT(*) FROM ({_RANKED.format(where='')}) GROUP BY segment",
+                                (keep_history + 1,))
+            for name, dead, total in rows:
+                if name in compressed and total and dead / total >= garbage_ratio:
+                    due.append(compressed[name])
+    return sorted(due, key=storage.segment_number)
+
+
+def compact_segment(path: str, keep_history: int = KEEP_HISTORY) -> Dict[str, int]:
+    """Rewrite one sealed segment compressed; returns record and byte counts (zero if skipped)."""
+    storage.update_index()
+    name = os.path.basename(path)
+    with closing(storage.open_index()) as conn:
+        indexed = conn.execute("SELECT indexed_bytes FROM segments WHERE name = ?", (name,)).fetchone()
+        if not indexed or indexed[0] != os.path.getsize(path):
+            return {"records_in": 0, "records_out": 0, "bytes_in": 0, "bytes_out": 0}
+        dead = _dead_seqs(conn, name, keep_history)
+
+    number, generation = storage.segment_number(path)
+    out = storage.compressed_segment_path(number, generation + 1 if storage.is_compressed(path) else 0)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    rows = []
+    records_in = records_out = 0
+    block: List[bytes] = []
+    block_bytes = 0
+    with open(tmp, "wb") as f:
+        def flush() -> None:
+            nonlocal block_bytes
+            if block:
+                f.write(gzip.compress(b"".join(block), compresslevel=6, mtime=0))
+                block.clear()
+                block_bytes = 0
+
+        for row, _, line in storage.index_rows(path):
+            records_in += 1
+            if row and row[0] in dead:
+                continue
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            if row:
+                rows.append((row[1], f.tell(), len(block)))
+            block.append(line)
+            block_bytes += len(line)
+            records_out += 1
+            if block_bytes >= BLOCK_BYTES or len(block) >= BLOCK_RECORDS:
+                flush()
+        flush()
+        f.flush()
+        os.fsync(f.fileno())
+
+    new_name = os.path.basename(out)
+    with closing(storage.open_index()) as conn, conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if not conn.execute("SELECT 1 FROM segments WHERE name = ?", (name,)).fetchone():
+            os.remove(tmp)  # another process compacted it first
+            return {"records_in": 0, "records_out": 0, "bytes_in": 0, "bytes_out": 0}
+        conn.execute("DELETE FROM records WHERE segment = ?", (name,))
+        conn.execute("DELETE FROM segments WHERE name = ?", (name,))
+        if records_out:
+            os.replace(tmp, out)
+            conn.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?)",
+                             ((storage.record_seq(out, off, item), hashed, new_name, off, item) for hashed, off, item in rows))
+            conn.execute("INSERT OR REPLACE INTO segments VALUES (?, ?)", (new_name, os.path.getsize(out)))
+        else:
+            os.remove(tmp)  # everything superseded: the segment goes away
+    bytes_in = os.path.getsize(path)
+    try:
+        os.remove(path)
+    except OSError:
+        pass  # removed with the other leftovers next run
+    return {"records_in": records_in, "records_out": records_out, "bytes_in": bytes_in,
+            "bytes_out": os.path.getsize(out) if records_out else 0}
+
+
+def compact(keep_history: int = KEEP_HISTORY, min_age: float = MIN_AGE) -> Dict[str, int]:
+    """Compact every segment that is due; returns the totals of this run."""
+    for leftover in storage.superseded_paths():
+        try:
+            os.remove(leftover)
+        except OSError:
+            pass
+    totals = {"segments": 0, "records_in": 0, "records_out": 0, "bytes_in": 0, "bytes_out": 0}
+    for path in plan(keep_history, min_age):
+        try:
+            done = compact_segment(path, keep_history)
+        except Exception:
+            with _stats_lock:
+                _stats["errors"] += 1
+            continue
+        totals["segments"] += bool(done["records_in"])
+        for k, v in done.items():
+            totals[k] += v
+    with _stats_lock:
+        _stats["runs"] += 1
+        for k, v in totals.items():
+            _stats[k] += v
+    return totals
+
+
+def compaction_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _loop() -> None:
+    while True:
+        time.sleep(INTERVAL)
+        try:
+            compact()
+        except Exception:
+            with _stats_lock:
+                _stats["errors"] += 1
+
+
+def start_background_compaction() -> None:
+    """Compact every STORAGE_COMPACT_INTERVAL seconds on a daemon thread (once per process)."""
+    global _thread
+    if INTERVAL <= 0:
+        return
+    with _stats_lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_loop, name="storage-compaction", daemon=True)
+    _thread.start()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compact the candidate store into compressed segments.")
+    ap.add_argument("--keep-history", type=int, default=KEEP_HISTORY, help="older records kept per candidate")
+    ap.add_argument("--min-age", type=float, default=MIN_AGE, help="seconds a sealed segment must be untouched")
+    args = ap.parse_args()
+    t = compact(args.keep_history, args.min_age)
+    saved = t["bytes_in"] - t["bytes_out"]
+    print(f"compacted {t['segments']} segments: {t['records_in']} -> {t['records_out']} records, "
+          f"{t['bytes_in'] / 1e6:.1f} -> {t['bytes_out'] / 1e6:.1f} MB ({saved / 1e6:.1f} MB reclaimed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+import re
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.7
+SHINGLE_SIZE = 2
+
+# Words that carry no topic: questions differ in their technical terms, and
+# character shingles let the shared "what is the difference between" wording
+# outweigh them.
+_STOPWORDS = frozenset("""
+    a about an and any are as at be between by can could describe do does explain for from give has have how
+    i if in into is it its me my of on one or please s should some tell that the their them these they this
+    those to us use using was we what when where which why will with would you your
+""".split())
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+_QUESTION_PREFIX = re.compile(r"^\s*(?:q\d+\s*[:.)-]|\d+\s*[.)-]|[-*•])\s*", re.IGNORECASE)
+
+
+def strip_question_prefix(text: str) -> str:
+    return _QUESTION_PREFIX.sub("", text or "").strip()
+
+
+def normalize_question(text: str) -> str:
+    text = strip_question_prefix(text)
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> FrozenSet[str]:
+    """Content words of the normalized question plus their runs of up to `size` words (in any order)."""
+    words = normalize_question(text).split()
+    words = [_stem(w) for w in words if w not in _STOPWORDS] or words
+    return frozenset(" ".join(sorted(words[i:i + n])) for n in range(1, size + 1) for i in range(len(words) - n + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+class QuestionIndex:
+    """Near-duplicate aware set of asked questions.
+
+    Questions are stored as word shingle sets of their normalized text;
+    membership means "some stored question has Jaccard similarity >=
+    threshold". An interview holds a handful of questions and a cache pool a
+    few dozen, so a linear scan over precomputed sets stays in the
+    microsecond range without an LSH layer.
+    """
+
+    __slots__ = ("threshold", "_items")
+
+    def __init__(self, questions: Iterable[str] = (), threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._items: List[Tuple[str, FrozenSet[str]]] = []
+        for q in questions:
+            self.add(q)
+
+    def add(self, question: str) -> None:
+        self._items.append((question, shingles(question)))
+
+    def similarity(self, question: str) -> float:
+        sh = shingles(question)
+        return max((jaccard(sh, s) for _, s in self._items), default=0.0)
+
+    def __contains__(self, question: object) -> bool:
+        return isinstance(question, str) and self.similarity(question) >= self.threshold
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        return (q for q, _ in self._items)
+
+    def most_novel(self, candidates: Iterable[str]) -> Tuple[Optional[str], float]:
+        """Pick the candidate least similar to anything already stored."""
+        best, best_score = None, 1.0
+        for c in candidates:
+            if not c:
+                continue
+            score = self.similarity(c)
+            if best is None or score < best_score:
+                best, best_score = c, score
+        return best, best_score
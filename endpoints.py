@@ -0,0 +1,168 @@
+"""Pool of OpenAI-compatible endpoints with health checks and latency-aware routing.
+
+    OPENAI_BASE_URLS=http://gpu1:11434/v1,http://gpu2:11434/v1,https://api.openai.com/v1
+
+Requests go to the endpoint with the fewest requests in flight
+("least_outstanding", the default) or the lowest EWMA latency weighted by
+load ("ewma"), set with LLM_ROUTING. Each endpoint has its own circuit
+breaker (resilience.get_breaker) and a background thread probes GET
+/models every LLM_HEALTH_INTERVAL seconds; unhealthy or tripped endpoints
+are tried last. Without OPENAI_BASE_URLS the pool holds OPENAI_BASE_URL only.
+
+Background work (answer grading) is a separate lane: it has its own breaker
+per endpoint, so its slow batches cannot trip the breaker live turns use,
+it does not feed the latency average, and it is routed to the endpoints
+with the fewest turns in flight. Turns ignore background load.
+"""
+from __future__ import annotations
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import resilience
+
+ROUTING = os.getenv("LLM_ROUTING", "least_outstanding")
+EWMA_ALPHA = 0.3
+HEALTH_INTERVAL = float(os.getenv("LLM_HEALTH_INTERVAL", "15"))
+HEALTH_TIMEOUT = 2.0
+
+
+class Endpoint:
+    __slots__ = ("url", "breaker", "background_breaker", "outstanding", "background", "ewma", "healthy", "stats",
+                 "_lock")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.breaker = resilience.get_breaker(url)
+        self.background_breaker = resilience.get_breaker(f"{url} (background)")
+        self.outstanding = 0
+        self.background = 0
+        self.ewma: Optional[float] = None
+        self.healthy = True
+        self.stats = {"requests": 0, "errors": 0, "failovers": 0, "hedges": 0, "background_requests": 0}
+        self._lock = threading.Lock()
+
+    def lane_breaker(self, background: bool = False) -> resilience.CircuitBreaker:
+        return self.background_breaker if background else self.breaker
+
+    def begin(self, failover: bool = False, hedge: bool = False, background: bool = False) -> None:
+        with self._lock:
+            if background:
+                self.background += 1
+                self.stats["background_requests"] += 1
+                return
+            self.outstanding += 1
+            self.stats["requests"] += 1
+            self.stats["failovers"] += failover
+            self.stats["hedges"] += hedge
+
+    def finish(self, latency: float, ok: bool, background: bool = False) -> None:
+        with self._lock:
+            if background:
+                self.background -= 1
+            else:
+                self.outstanding -= 1
+                if ok:
+                    self.ewma = latency if self.ewma is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma
+            if not ok:
+                self.stats["errors"] += 1
+        breaker = self.lane_breaker(background)
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def available(self, background: bool = False) -> bool:
+        # Background work also keeps off endpoints that live turns are failing on.
+        closed = self.breaker.state == "closed" and (not background or self.background_breaker.state == "closed")
+        return self.healthy and closed
+
+    def score(self, policy: str, background: bool = False) -> tuple:
+        if background:
+            return (not self.available(True), self.outstanding, self.background, random.random())
+        # Endpoints without samples score as fast so new servers get traffic straight away.
+        ewma = self.ewma or 0.0
+        if policy == "ewma":
+            return (not self.available(), ewma * (self.outstanding + 1), random.random())
+        return (not self.available(), self.outstanding, ewma, random.random())
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "url": self.url, "healthy": self.healthy, "breaker": self.breaker.state,
+                "background_breaker": self.background_breaker.state,
+                "outstanding": self.outstanding, "background": self.background,
+                "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+                **self.stats,
+            }
+
+
+class EndpointPool:
+    def __init__(self, urls: List[str], policy: str = ROUTING):
+        """`urls` is fixed for the pool's lifetime (see configured_urls); duplicates are dropped."""
+        self.policy = policy
+        self.endpoints = [Endpoint(u) for u in dict.fromkeys(u.strip().rstrip("/") for u in urls if u.strip())]
+        self._lock = threading.Lock()
+        self._checker: Optional[threading.Thread] = None
+
+    def urls(self) -> List[str]:
+        return [ep.url for ep in self.endpoints]
+
+    def ranked(self, background: bool = False) -> List[Endpoint]:
+        """Endpoints in the order a request (or a background request) should try them."""
+        return sorted(self.endpoints, key=lambda ep: ep.score(self.policy, background))
+
+    def check_health(self, api_key: str = "") -> None:
+        import httpx
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        for ep in self.ranked():
+            try:
+                r = httpx.get(f"{ep.url}/models", headers=headers, timeout=HEALTH_TIMEOUT)
+                ep.healthy = r.status_code < 500
+            except Exception:
+                ep.healthy = False
+
+    def start_health_checks(self) -> None:
+        with self._lock:
+            if self._checker is not None:
+                return
+            self._checker = threading.Thread(target=self._health_loop, name="llm-health", daemon=True)
+        self._checker.start()
+
+    def _health_loop(self) -> None:
+        while True:
+            time.sleep(HEALTH_INTERVAL)
+            try:
+                self.check_health(os.getenv("OPENAI_API_KEY", ""))
+            except ImportError:
+                return
+            except Exception:
+                pass
+
+    def stats(self) -> List[Dict[str, object]]:
+        return [ep.snapshot() for ep in self.endpoints]
+
+
+_pool: Optional[EndpointPool] = None
+_pool_lock = threading.Lock()
+
+
+def configured_urls() -> List[str]:
+    urls = os.getenv("OPENAI_BASE_URLS") or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    return [u for u in urls.split(",") if u.strip()]
+
+
+def get_pool() -> EndpointPool:
+    """The process-wide pool; call after the environment has been loaded."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = EndpointPool(configured_urls())
+            _pool.start_health_checks()
+        return _pool
+
+
+def endpoint_stats() -> List[Dict[str, object]]:
+    return get_pool().stats() if _pool is not None else []
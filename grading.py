@@ -0,0 +1,272 @@
+"""Background grading of technical answers.
+
+    python grading.py --backfill     # grade stored answers that have no grade yet
+
+Each answer in the technical phase is queued with its question and
+technology. A dispatcher thread groups up to GRADING_BATCH of them into
+one LLM request and hands the batch to one of GRADING_WORKERS threads. The
+queue is bounded at GRADING_QUEUE_SIZE. While every worker is busy the
+queue fills, and once it is full `submit` refuses the job instead of
+blocking the turn. Refused answers, and answers still queued at exit, are
+picked up by --backfill from the stored transcripts.
+
+Scores run from 0 to 5 with one line of feedback. They are appended next
+to the candidate store (storage.persist_grades). When no LLM answers, a
+heuristic score is stored with method="heuristic". Requests go through the
+endpoint pool's background lane, so grading failures never open the
+breakers that live turns depend on.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+import resilience
+import storage
+from llm_client import try_background_completion
+from techstack import parse_stack, tech_key
+
+BATCH = int(os.getenv("GRADING_BATCH", "8"))
+BATCH_WINDOW = float(os.getenv("GRADING_BATCH_WINDOW", "2.0"))  # seconds to wait for a fuller batch
+WORKERS = int(os.getenv("GRADING_WORKERS", "2"))
+QUEUE_SIZE = int(os.getenv("GRADING_QUEUE_SIZE", "512"))
+DEADLINE = float(os.getenv("GRADING_DEADLINE", "60"))
+ATTEMPT_TIMEOUT = float(os.getenv("GRADING_ATTEMPT_TIMEOUT", "20"))
+ANSWER_CHARS = 1200  # longer answers are cut to bound the prompt
+
+GRADING_PROMPT = (
+    "You grade candidates' answers to technical interview questions. For each numbered item return "
+    'an object {"id": <number>, "score": <integer 0-5>, "feedback": "<one short sentence>"}, where 0 is '
+    "no answer or wrong, 3 partially correct and 5 complete and precise. Reply with the JSON array only."
+)
+_QUESTION_RE = re.compile(r"^Q\d+:\s*")
+_WORD_RE = re.compile(r"\w+")
+_DONT_KNOW = ("don't know", "dont know", "no idea", "not sure", "no sé", "je ne sais pas", "pata nahi", "skip")
+
+
+def guess_tech(question: str, tech_stack: str) -> str:
+    """The technology of the candidate's stack that the question is about (the first one if none is named)."""
+    techs = parse_stack(tech_stack or "") or ("General Programming",)
+    lowered = question.lower()
+    return next((t for t in techs if tech_key(t) in lowered), techs[0])
+
+
+def heuristic_score(question: str, answer: str, tech: str) -> int:
+    """Rough 0-4 score from length and overlap with the question: a stand-in, not a judgement."""
+    lowered = answer.lower()
+    words = _WORD_RE.findall(lowered)
+    if len(words) < 3 or any(p in lowered for p in _DONT_KNOW):
+        return 0
+    score = 1 + min(2, len(words) // 25)
+    topic = {w for w in _WORD_RE.findall(question.lower()) if len(w) > 3}
+    if len(topic.intersection(words)) >= 2 or tech_key(tech) in lowered:
+        score += 1
+    return score
+
+
+def grading_messages(jobs: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    items = "\n\n".join(
+        f"{i}. [{j['tech']}] Q: {j['question']}\nA: {j['answer'][:ANSWER_CHARS]}" for i, j in enumerate(jobs, 1))
+    return [{"role": "system", "content": GRADING_PROMPT}, {"role": "user", "content": items}]
+
+
+def parse_grades(text: Optional[str], n: int) -> Dict[int, Dict[str, Any]]:
+    """{item number: {"score", "feedback"}} from the model's reply; malformed items are left out."""
+    if not text or "[" not in text:
+        return {}
+    try:
+        items = json.loads(text[text.index("["):text.rindex("]") + 1])
+    except ValueError:
+        return {}
+    out = {}
+    for it in items if isinstance(items, list) else ():
+        try:
+            i, score = int(it["id"]), int(it["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 1 <= i <= n:
+            out[i] = {"score": max(0, min(5, score)), "feedback": str(it.get("feedback") or "")[:300]}
+    return out
+
+
+def grade_batch(jobs: List[Dict[str, Any]], complete: Callable = try_background_completion) -> List[Dict[str, Any]]:
+    """Grade `jobs` with one LLM request, falling back to the heuristic per answer."""
+    started = time.perf_counter()
+    model = jobs[0].get("model") or "gpt-4o-mini"
+    with resilience.deadline(DEADLINE, attempt=ATTEMPT_TIMEOUT):
+        reply = complete(grading_messages(jobs), model=model, temperature=0.0, max_tokens=60 * len(jobs) + 40)
+    graded = parse_grades(reply, len(jobs))
+    now = datetime.utcnow().isoformat() + "Z"
+    out = []
+    for i, j in enumerate(jobs, 1):
+        g = graded.get(i)
+        if g is None:
+            g = {"score": heuristic_score(j["question"], j["answer"], j["tech"]), "feedback": ""}
+        out.append({
+            "session_id": j["session_id"], "hashed_email": j.get("hashed_email"), "timestamp": now,
+            "tech": j["tech"], "question": j["question"], **g,
+            "method": "llm" if i in graded else "heuristic", "model": model if i in graded else None,
+        })
+    metrics.observe("grading_batch_seconds", time.perf_counter() - started, {},
+                    outcome="llm" if graded else "heuristic")
+    return out
+
+
+class GradingPipeline:
+    """Bounded queue -> batching dispatcher -> fixed worker pool -> storage.persist_grades."""
+
+    def __init__(self, complete: Callable = try_background_completion, workers: int = WORKERS, batch: int = BATCH,
+                 queue_size: int = QUEUE_SIZE, batch_window: float = BATCH_WINDOW):
+        self.complete = complete
+        self.batch = batch
+        self.batch_window = batch_window
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self.stats = {"submitted": 0, "rejected": 0, "graded": 0, "heuristic": 0, "batches": 0, "errors": 0,
+                      "grade_seconds": 0.0}
+        self.started = time.monotonic()
+        self._workers = workers
+        self._slots = threading.BoundedSemaphore(workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grader")
+        self._lock = threading.Lock()
+        threading.Thread(target=self._dispatch, name="grading-dispatch", daemon=True).start()
+
+    def submit(self, job: Dict[str, Any]) -> bool:
+        """Queue one answer; never blocks. False when the queue is full (see --backfill)."""
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.stats["rejected"] += 1
+            return False
+        with self._lock:
+            self.stats["submitted"] += 1
+        return True
+
+    def _dispatch(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            # Waiting for a free worker here is the backpressure: the queue fills instead of the executor.
+            self._slots.acquire()
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            grades = grade_batch(batch, self.complete)
+            storage.persist_grades(grades)
+            with self._lock:
+                self.stats["graded"] += len(grades)
+                self.stats["heuristic"] += sum(g["method"] == "heuristic" for g in grades)
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+        finally:
+            with self._lock:
+                self.stats["batches"] += 1
+                self.stats["grade_seconds"] += time.perf_counter() - started
+            self._slots.release()
+            for _ in batch:
+                self.queue.task_done()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Block until every queued answer is graded; False if `timeout` expired first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        elapsed = max(1e-9, time.monotonic() - self.started)
+        stats["grade_seconds"] = round(stats["grade_seconds"], 3)
+        return {**stats, "queued": self.queue.qsize(), "workers": self._workers,
+                "answers_per_minute": round(60 * stats["graded"] / elapsed, 2)}
+
+
+_grader: Optional[GradingPipeline] = None
+_grader_lock = threading.Lock()
+
+
+def get_grader() -> GradingPipeline:
+    global _grader
+    with _grader_lock:
+        if _grader is None:
+            _grader = GradingPipeline()
+        return _grader
+
+
+def grading_stats() -> Dict[str, Any]:
+    return _grader.snapshot() if _grader is not None else {}
+
+
+def answered_questions(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Grading jobs for every (question, answer) pair in a stored candidate record."""
+    tech_stack = (record.get("profile") or {}).get("tech_stack") or ""
+    jobs, question = [], None
+    for m in record.get("transcript") or []:
+        content = m.get("content") or ""
+        if m.get("role") == "assistant":
+            question = _QUESTION_RE.sub("", content) if _QUESTION_RE.match(content) else None
+        elif question and content.strip():
+            jobs.append({"session_id": record.get("session_id"), "hashed_email": record.get("hashed_email"),
+                         "tech": guess_tech(question, tech_stack), "question": question, "answer": content})
+            question = None
+    return jobs
+
+
+def backfill(model: str | None = None, complete: Callable = try_background_completion, batch: int = BATCH) -> int:
+    """Grade every stored answer without a grade, synchronously; returns how many were graded."""
+    from session import is_end_message
+    done = {(g.get("session_id"), g.get("question")) for g in storage.load_grades()}
+    pending: List[Dict[str, Any]] = []
+    graded = 0
+    for path in storage.segment_paths():
+        for _, _, line in storage.iter_records(path):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            for job in answered_questions(record):
+                if (job["session_id"], job["question"]) not in done and not is_end_message(job["answer"]):
+                    done.add((job["session_id"], job["question"]))
+                    pending.append({**job, "model": model})
+            while len(pending) >= batch:
+                storage.persist_grades(grade_batch(pending[:batch], complete))
+                graded += batch
+                del pending[:batch]
+    if pending:
+        storage.persist_grades(grade_batch(pending, complete))
+        graded += len(pending)
+    return graded
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Grade stored technical answers.")
+    ap.add_argument("--backfill", action="store_true", help="grade stored answers that have no grade yet")
+    ap.add_argument("--model", default=None)
+    args = ap.parse_args()
+    if not args.backfill:
+        ap.error("nothing to do; pass --backfill")
+    from llm_client import default_model
+    print(f"graded {backfill(args.model or default_model())} answers into {storage.GRADES_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Append-only per-session turn journal.
+
+Each turn appends one JSON line holding only what changed: new messages,
+profile fields, session flags and newly asked questions. A worker that
+dies mid-interview loses at most the turn in flight; `replay` folds the
+lines back into the session state (a torn last line is ignored).
+
+The journal is written to JOURNAL_DIR once the candidate has consented;
+before that it is kept in memory only. Either way it also holds the
+encoded messages, so the transcript download is assembled from fragments
+that were serialized once, when their turn happened.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from storage import DATA_DIR
+
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", os.path.join(DATA_DIR, "journal"))
+# prune() deletes journals untouched for this many seconds.
+JOURNAL_RETENTION = float(os.getenv("JOURNAL_RETENTION", str(24 * 3600)))
+# "turn": fsync every appended turn; "never": leave it to the OS.
+JOURNAL_FSYNC = os.getenv("JOURNAL_FSYNC", "turn")
+
+# Session attributes a turn can change, besides messages, profile and asked questions.
+FIELDS = ("language", "language_confirmed", "intro_ack", "current_field", "phase", "tech_start_idx", "ended", "model", "consent")
+
+_SESSION_ID_RE = re.compile(r"^[\w-]{1,64}$")
+_prune_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def journal_path(session_id: str) -> Optional[str]:
+    """Where a session's journal lives; None for ids that are not safe file names."""
+    if not session_id or not _SESSION_ID_RE.match(session_id):
+        return None
+    return os.path.join(JOURNAL_DIR, f"{session_id}.jsonl")
+
+
+def _encode(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class TurnJournal:
+    __slots__ = ("session_id", "path", "lines", "written", "fragments", "asked", "state", "profile", "_transcript", "_lock")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.path = journal_path(session_id)
+        self.lines: List[str] = []  # every delta, so a late consent can write the journal from the start
+        self.written = 0
+        self.fragments: List[str] = []  # one encoded message per entry of session.messages
+        self.asked = 0
+        self.state: Dict[str, Any] = {}
+        self.profile: Dict[str, Any] = {}
+        self._transcript: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def seed(self, session, size: int) -> None:
+        """Start from a replayed session: only later turns are appended, after the
+        first `size` bytes (anything past them is a torn write and is cut off)."""
+        with self._lock:
+            if self.path and os.path.getsize(self.path) > size:
+                with open(self.path, "r+b") as f:
+                    f.truncate(size)
+            self.fragments = [_encode(m) for m in session.messages]
+            self.profile = dict(session.profile)
+            self.state = {k: getattr(session, k) for k in FIELDS}
+            self.asked = len(session.asked)
+
+    def record(self, session) -> bool:
+        """Append what changed in `session` since the last call; False if nothing did."""
+        with self._lock:
+            delta: Dict[str, Any] = {}
+            new = session.messages[len(self.fragments):]
+            if new:
+                encoded = [_encode(m) for m in new]
+                self.fragments.extend(encoded)
+                delta["messages"] = new
+            profile = {k: v for k, v in session.profile.items() if self.profile.get(k) != v}
+            if profile:
+                self.profile.update(profile)
+                delta["profile"] = profile
+            fields = {k: getattr(session, k) for k in FIELDS if self.state.get(k, self) != getattr(session, k)}
+            if fields:
+                self.state.update(fields)
+                delta["set"] = fields
+            asked = list(session.asked)[self.asked:]
+            if asked:
+                self.asked += len(asked)
+                delta["asked"] = asked
+            if not delta:
+                return False
+            delta["ts"] = round(time.time(), 3)
+            if new and len(delta) == 2:
+                # Messages are already encoded: splice them in instead of serializing twice.
+                self.lines.append(f'{{"messages":[{",".join(encoded)}],"ts":{delta["ts"]}}}')
+            else:
+                self.lines.append(_encode(delta))
+            if session.consent:
+                self._flush()
+            return True
+
+    def _flush(self) -> None:
+        if self.path is None or self.written == len(self.lines):
+            return
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        data = "".join(line + "\n" for line in self.lines[self.written:]).encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(data)  # one write per turn: a crash leaves at most a torn last line
+            f.flush()
+            if JOURNAL_FSYNC == "turn":
+                os.fsync(f.fileno())
+        self.written = len(self.lines)
+
+    def transcript(self, profile: Dict[str, Any]) -> bytes:
+        """The download payload, rebuilt only when the journal has grown since the last call."""
+        with self._lock:
+            key = (len(self.lines), len(self.fragments))
+            if self._transcript is None or self._transcript[0] != key:
+                head = _encode({"profile": profile, "timestamp": str(datetime.now())})[:-1]
+                body = f'{head},"chat":[{",".join(self.fragments)}]}}'
+                self._transcript = (key, body.encode("utf-8"))
+            return self._transcript[1]
+
+    def discard(self) -> None:
+        with self._lock:
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+            self.written = len(self.lines)
+
+
+def replay(session_id: str) -> Optional[Dict[str, Any]]:
+    """Fold a session's journal into {"messages", "profile", "asked", "set", "turns", "size"};
+    None if there is none. `size` is the length of the intact prefix of the file."""
+    path = journal_path(session_id)
+    if path is None or not os.path.exists(path):
+        return None
+    state: Dict[str, Any] = {"messages": [], "profile": {}, "asked": [], "set": {}, "turns": 0, "size": 0}
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # torn write from a crash mid-turn
+            try:
+                delta = json.loads(line)
+            except ValueError:
+                break
+            state["messages"].extend(delta.get("messages", ()))
+            state["profile"].update(delta.get("profile", {}))
+            state["asked"].extend(delta.get("asked", ()))
+            state["set"].update(delta.get("set", {}))
+            state["turns"] += 1
+            state["size"] += len(line)
+    return state if state["turns"] else None
+
+
+def prune(max_age: float = JOURNAL_RETENTION) -> int:
+    """Delete journals that have not been appended to for `max_age` seconds."""
+    if not os.path.isdir(JOURNAL_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(JOURNAL_DIR):
+        path = os.path.join(JOURNAL_DIR, name)
+        try:
+            if name.endswith(".jsonl") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def maybe_prune(every: float = 3600.0) -> None:
+    """prune() at most once per `every` seconds per process."""
+    global _last_prune
+    now = time.monotonic()
+    if _last_prune and now - _last_prune < every:
+        return
+    with _prune_lock:
+        if _last_prune and now - _last_prune < every:
+            return
+        _last_prune = now
+    prune()
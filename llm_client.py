@@ -1,26 +1,224 @@
 import os
-from typing import List, Dict
-from openai import OpenAI
-from dotenv import load_dotenv
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Dict, Tuple
 
-load_dotenv()
-DEFAULT_BASE = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+import endpoints
+import metrics
+import resilience
+
+# openai/httpx/dotenv are imported on first use: they dominate import time and
+# the language prompt does not need them.
+_env_loaded = False
+_env_lock = threading.Lock()
+
+# One client (and therefore one keep-alive connection pool) per endpoint, shared
+# by every Streamlit session in the process.
+_clients: Dict[Tuple[str, str, float], "OpenAI"] = {}
+_clients_lock = threading.Lock()
+_pool_stats = {"hits": 0, "misses": 0}
+
+
+def load_env() -> None:
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
+
+
+def default_base() -> str:
+    load_env()
+    return os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+
+def default_model() -> str:
+    load_env()
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+
+def get_client(base_url: str | None = None, api_key: str | None = None, timeout: float | None = None) -> "OpenAI":
+    load_env()
+    base_url = base_url or default_base()
+    api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+    timeout = float(os.getenv("OPENAI_TIMEOUT", "60")) if timeout is None else float(timeout)
+    key = (base_url, api_key, timeout)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _pool_stats["hits"] += 1
+            return client
+        _pool_stats["misses"] += 1
+        import httpx
+        from openai import OpenAI
+        http_client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=float(os.getenv("OPENAI_POOL_KEEPALIVE_EXPIRY", "30")),
+            ),
+        )
+        # Retries are driven by the callers' deadlines, not hidden inside the SDK.
+        client = OpenAI(base_url=base_url, api_key=api_key, timeout=timeout, http_client=http_client,
+                        max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "0")))
+        _clients[key] = client
+        return client
+
+
+def warm_up() -> None:
+    """Import the SDK and build the default client ahead of the first question."""
+    load_env()
+    if os.getenv("OPENAI_API_KEY"):
+        get_client()
+    else:
+        import openai  # noqa: F401
+
+
+def pool_stats() -> Dict[str, int]:
+    with _clients_lock:
+        return {**_pool_stats, "clients": len(_clients)}
 
 
 def chat_completion(messages: List[Dict], model: str | None = None, temperature: float = 0.3, max_tokens: int = 600) -> str:
-    model = model or DEFAULT_MODEL
+    model = model or default_model()
+    with metrics.timer("llm_request_seconds", stream="false") as labels:
+        try:
+            client = get_client()
+            resp = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            labels["outcome"] = "ok"
+            return resp.choices[0].message.content or ""
+        except Exception as e:
+            labels["outcome"] = "error"
+            return f"[LLM error] {e}"
+
+
+def try_background_completion(messages: List[Dict], model: str = "gpt-4o-mini", temperature: float = 0.7,
+                              max_tokens: int = 150):
+    """try_chat_completion in the background lane (see endpoints.py), for grading and other batch work."""
+    return try_chat_completion(messages, model, temperature, max_tokens, background=True)
+
+
+def iter_stream_text(stream: Iterable) -> Iterator[str]:
+    """Yield the text deltas of a streamed completion.
+
+    Errors raised mid-stream propagate: the caller must not commit a
+    question that broke off halfway.
+    """
+    for chunk in stream:
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+def _timed_stream(tokens: Iterator[str], started: float, labels: Dict[str, str]) -> Iterator[str]:
+    """Record time to first token and time to drain under the caller's labels
+    (the stream is usually consumed on another thread)."""
+    first = True
     try:
-        client = OpenAI(
-            base_url=os.getenv("OPENAI_BASE_URL", DEFAULT_BASE),
-            api_key=os.getenv("OPENAI_API_KEY", ""),
-        )
-        resp = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        return resp.choices[0].message.content or ""
-    except Exception as e:
-        return f"[LLM error] {e}"
+        for tok in tokens:
+            if first:
+                metrics.observe("llm_request_seconds", time.perf_counter() - started, labels, stream="true", outcome="ok")
+                first = False
+            yield tok
+    except Exception:
+        if first:
+            metrics.observe("llm_request_seconds", time.perf_counter() - started, labels, stream="true", outcome="error")
+        metrics.observe("llm_stream_seconds", time.perf_counter() - started, labels, outcome="error")
+        raise
+    if first:
+        metrics.observe("llm_request_seconds", time.perf_counter() - started, labels, stream="true", outcome="empty")
+    metrics.observe("llm_stream_seconds", time.perf_counter() - started, labels, outcome="ok")
+
+
+def _endpoint_stream(ep: "endpoints.Endpoint", stream: Iterable, started: float, background: bool) -> Iterator:
+    """Pass the chunks through and settle the endpoint (latency, breaker) once the stream ends or fails."""
+    ok = False
+    try:
+        yield from stream
+        ok = True
+    except GeneratorExit:
+        ok = True  # abandoned by the consumer, not failed by the endpoint
+        raise
+    finally:
+        ep.finish(time.perf_counter() - started, ok=ok, background=background)
+
+
+def _call_endpoint(ep: "endpoints.Endpoint", api_key: str, timeout: float, kwargs: Dict, failover: bool = False,
+                   hedge: bool = False, background: bool = False):
+    started = time.perf_counter()
+    ep.begin(failover=failover, hedge=hedge, background=background)
+    try:
+        resp = get_client(base_url=ep.url, api_key=api_key).chat.completions.create(timeout=timeout, **kwargs)
+    except Exception:
+        ep.finish(time.perf_counter() - started, ok=False, background=background)
+        raise
+    if kwargs.get("stream"):
+        return _endpoint_stream(ep, resp, started, background)
+    ep.finish(time.perf_counter() - started, ok=True, background=background)
+    return resp
+
+
+def try_chat_completion(messages: List[Dict], model: str = "gpt-4o-mini", temperature: float = 0.7, max_tokens: int = 150,
+                        stream: bool = False, background: bool = False):
+    """Like chat_completion but returns None when no key is set or the call fails.
+
+    Routed over the endpoint pool (endpoints.py): a failed attempt fails over
+    to the next endpoint while the caller's resilience.deadline allows, and
+    endpoints whose circuit breaker is open are skipped. With stream=True
+    returns an iterator of text deltas instead of a string; it raises if the
+    stream breaks off after it has started. background=True
+    is for work no candidate waits on: it uses the background lane's
+    breakers and routing and is never hedged.
+    """
+    load_env()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    kwargs = dict(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=stream)
+    started = time.perf_counter()
+    ranked = endpoints.get_pool().ranked(background)
+    attempts = 0
+    for i, ep in enumerate(ranked):
+        timeout = resilience.attempt_timeout()
+        # Past the turn deadline: fall back locally at once.
+        if timeout <= 0:
+            break
+        if not ep.lane_breaker(background).allow():
+            continue
+        failover = attempts > 0
+        attempts += 1
+        try:
+            if stream:
+                tokens = iter_stream_text(_call_endpoint(ep, api_key, timeout, kwargs, failover))
+                return _timed_stream(tokens, started, metrics.current_labels())
+            if background:
+                response = _call_endpoint(ep, api_key, timeout, kwargs, failover, background=True)
+                metrics.observe("llm_request_seconds", time.perf_counter() - started, stream="false", outcome="ok")
+                return response.choices[0].message.content
+            # Hedge onto the next healthy endpoint (or the same one if it is alone).
+            spare = next((e for e in ranked[i + 1:] if e.available()), ep)
+            response = resilience.hedged(
+                lambda: _call_endpoint(ep, api_key, timeout, kwargs, failover),
+                resilience.HEDGE_AFTER, timeout,
+                backup=lambda: _call_endpoint(spare, api_key, timeout, kwargs, hedge=True),
+            )
+            metrics.observe("llm_request_seconds", time.perf_counter() - started, stream="false", outcome="ok")
+            return response.choices[0].message.content
+        except Exception:
+            continue
+    metrics.observe("llm_request_seconds", time.perf_counter() - started, stream=str(stream).lower(),
+                    outcome="error" if attempts else "skipped")
+    return None
@@ -0,0 +1,154 @@
+"""Local stand-in for an OpenAI-compatible endpoint, for load tests.
+
+    python loadtest/fake_openai.py --port 8900 --latency-ms 300 --jitter-ms 100 --error-rate 0.02
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8900/v1 and any
+OPENAI_API_KEY. Supports /v1/chat/completions (plain and stream=true) and
+/v1/models.
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+TOPICS = ["indexes", "caching", "concurrency", "testing", "memory", "error handling", "packaging", "profiling", "security", "APIs"]
+TEMPLATES = [
+    "How do you approach {topic} in {tech}?",
+    "What mistakes do teams make with {topic} when using {tech}?",
+    "Explain how {tech} deals with {topic} under load.",
+    "Describe a production incident involving {topic} and {tech}.",
+    "Which tools would you pick for {topic} in a {tech} codebase, and why?",
+]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format, *args):  # keep load-test output readable
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": {"message": "invalid JSON"}})
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "not found"}})
+
+        srv = self.server
+        srv.count("requests")
+        time.sleep(max(0.0, random.gauss(srv.latency, srv.jitter)))
+        if random.random() < srv.error_rate:
+            srv.count("errors")
+            return self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+
+        text = self._answer(req)
+        model = req.get("model", "fake-model")
+        cid = f"chatcmpl-fake-{next(srv.ids)}"
+        if req.get("stream"):
+            return self._stream(cid, model, text)
+        self._send_json(200, {
+            "id": cid, "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 50, "completion_tokens": len(text.split()), "total_tokens": 50 + len(text.split())},
+        })
+
+    def _answer(self, req: dict) -> str:
+        prompt = " ".join(str(m.get("content", "")) for m in req.get("messages", []))
+        tech = prompt.split("'")[1] if prompt.count("'") >= 2 else "software"
+        n = 1
+        for word in prompt.split():
+            if word.isdigit():
+                n = min(int(word), 10)
+                break
+        picks = zip(random.sample(TOPICS, k=n), random.sample(TEMPLATES, k=min(n, len(TEMPLATES))))
+        return "\n".join(t.format(topic=topic, tech=tech) for topic, t in picks)
+
+    def _stream(self, cid: str, model: str, text: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for i, word in enumerate(text.split(" ")):
+            chunk = {
+                "id": cid, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.server.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], latency_ms: float = 200, jitter_ms: float = 50,
+                 error_rate: float = 0.0, token_delay_ms: float = 5):
+        super().__init__(addr, FakeOpenAIHandler)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.token_delay = token_delay_ms / 1000
+        self.ids = itertools.count(1)
+        self.stats = {"requests": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_server(port: int = 0, **kwargs) -> FakeOpenAIServer:
+    """Serve on a background thread; port 0 picks a free port."""
+    srv = FakeOpenAIServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=srv.serve_forever, name="fake-openai", daemon=True).start()
+    return srv
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--latency-ms", type=float, default=200)
+    ap.add_argument("--jitter-ms", type=float, default=50)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--token-delay-ms", type=float, default=5)
+    args = ap.parse_args()
+    srv = FakeOpenAIServer(("127.0.0.1", args.port), args.latency_ms, args.jitter_ms, args.error_rate, args.token_delay_ms)
+    print(f"fake OpenAI endpoint on {srv.base_url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
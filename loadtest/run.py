@@ -0,0 +1,130 @@
+"""Headless load test: N simulated candidates interviewing at once.
+
+    python loadtest/run.py --sessions 200 --concurrency 50 --latency-ms 300 --error-rate 0.02
+
+Every candidate runs the real app.py through Streamlit's AppTest harness:
+language choice, "yes", the seven profile fields, five technical answers,
+then "bye". The app talks to a bundled fake OpenAI-compatible server
+(loadtest/fake_openai.py) unless --base-url points elsewhere. Reports
+per-turn p50/p95/p99 latency, throughput and resident memory per session.
+"""
+from __future__ import annotations
+import argparse
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai import start_server  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+
+def script_for(i: int) -> List[str]:
+    return [
+        "English",
+        "yes",
+        f"Candidate {i}",
+        f"candidate{i}@example.com",
+        f"+1 555 {i:04d}",
+        "Backend Engineer",
+        str(i % 15),
+        "Berlin",
+        "Python, SQL, React",
+        "I would add an index and check the query plan.",
+        "Use a bounded cache with TTL and measure the hit ratio.",
+        "Profile first, then remove the hot allocation.",
+        "Write a failing test, then fix the race with a lock.",
+        "Validate input at the boundary and log the rejection.",
+        "bye",
+    ]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def run_session(i: int, timeout: float, keep: list, lock: threading.Lock) -> Dict:
+    from streamlit.testing.v1 import AppTest
+
+    turns: List[float] = []
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run()
+    for text in script_for(i):
+        start = time.perf_counter()
+        at.chat_input[0].set_value(text).run()
+        turns.append(time.perf_counter() - start)
+        if at.exception:
+            return {"turns": turns, "error": str(at.exception[0].message)}
+    with lock:
+        keep.append(at)  # hold the session so memory per session is measurable
+    return {"turns": turns, "error": None, "ended": bool(at.session_state["interview"].ended)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Concurrent-session load test for app.py.")
+    ap.add_argument("--sessions", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-turn script timeout in seconds")
+    ap.add_argument("--base-url", help="use an existing endpoint instead of the bundled fake server")
+    ap.add_argument("--latency-ms", type=float, default=200)
+    ap.add_argument("--jitter-ms", type=float, default=50)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--no-question-cache", action="store_true", help="force every question through the endpoint")
+    args = ap.parse_args()
+
+    server = None
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        server = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "loadtest")
+    os.environ["OPENAI_MODEL"] = os.environ.get("OPENAI_MODEL", "fake-model")
+    if args.no_question_cache:
+        os.environ["QUESTION_CACHE"] = "0"
+
+    keep: list = []
+    lock = threading.Lock()
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda i: run_session(i, args.timeout, keep, lock), range(args.sessions)))
+    wall = time.perf_counter() - started
+    rss_after = rss_bytes()
+
+    turns = [t for r in results for t in r["turns"]]
+    errors = [r["error"] for r in results if r["error"]]
+    completed = sum(1 for r in results if not r["error"] and r.get("ended"))
+    print(f"sessions: {args.sessions} (concurrency {args.concurrency}), completed: {completed}, errors: {len(errors)}")
+    print(f"turns: {len(turns)} in {wall:.1f}s -> {len(turns) / wall:.1f} turns/s, {args.sessions / wall:.2f} sessions/s")
+    print(f"turn latency: p50 {percentile(turns, 50) * 1000:.0f} ms, p95 {percentile(turns, 95) * 1000:.0f} ms, "
+          f"p99 {percentile(turns, 99) * 1000:.0f} ms, mean {statistics.fmean(turns) * 1000 if turns else 0:.0f} ms")
+    print(f"memory: {(rss_after - rss_before) / max(1, len(keep)) / 1024:.0f} KiB RSS per live session")
+    if server is not None:
+        print(f"endpoint: {server.stats['requests']} requests, {server.stats['errors']} injected errors")
+    for e in errors[:5]:
+        print(f"  error: {e}")
+
+
+if __name__ == "__main__":
+    main()
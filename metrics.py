@@ -0,0 +1,201 @@
+"""In-process latency histograms with Prometheus text export.
+
+    with metrics.tagged(phase="technical", model="gpt-4o-mini"):
+        with metrics.timer("llm_request_seconds", outcome="ok"):
+            ...
+
+Every observation carries the current session phase and model (set with
+`tagged`, which follows the caller's context) plus any extra labels.
+`render_prometheus()` returns the text exposition format; it is served by
+server.py at /metrics, and the Streamlit process exposes it on METRICS_PORT
+and/or rewrites METRICS_FILE every METRICS_FILE_INTERVAL seconds when those
+are set (see `start_exporter`).
+"""
+from __future__ import annotations
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+PREFIX = "talentscout_"
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+HELP = {
+    "turn_seconds": "Engine time for one candidate turn, excluding rendering.",
+    "llm_request_seconds": "Chat completion latency (first token for streamed calls).",
+    "llm_stream_seconds": "Time to drain a streamed chat completion, by outcome (ok, or error if it broke off).",
+    "question_generation_seconds": "Time to produce one technical question, by source.",
+    "sentiment_seconds": "Sentiment analysis of one candidate message.",
+    "persist_seconds": "Handing a finished interview to the storage writer.",
+    "storage_batch_seconds": "Writer thread time to append and index one batch.",
+    "grading_batch_seconds": "Grading one batch of technical answers, by outcome (llm or heuristic).",
+    "render_seconds": "Streamlit time to render the chat for one run.",
+}
+
+_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("metric_labels", default={})
+_lock = threading.Lock()
+# (name, sorted label items) -> [bucket counts..., +Inf count, sum]
+_series: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+
+
+def current_labels() -> Dict[str, str]:
+    return {"phase": "none", "model": "", **_labels.get()}
+
+
+@contextmanager
+def tagged(**labels: str) -> Iterator[None]:
+    """Attach labels (phase, model, ...) to everything observed inside the block."""
+    token = _labels.set({**_labels.get(), **{k: str(v) for k, v in labels.items()}})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def observe(name: str, seconds: float, labels: Dict[str, str] | None = None, **extra: str) -> None:
+    merged = {**(labels if labels is not None else current_labels()), **{k: str(v) for k, v in extra.items()}}
+    key = (name, tuple(sorted(merged.items())))
+    with _lock:
+        row = _series.get(key)
+        if row is None:
+            row = _series[key] = [0.0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                row[i] += 1
+                break
+        else:
+            row[len(BUCKETS)] += 1
+        row[-1] += seconds
+
+
+@contextmanager
+def timer(name: str, **extra: str) -> Iterator[Dict[str, str]]:
+    """Time the block; labels added to the yielded dict (e.g. source=...) are recorded too."""
+    labels = dict(extra)
+    start = time.perf_counter()
+    try:
+        yield labels
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def reset() -> None:
+    with _lock:
+        _series.clear()
+
+
+def _fmt_labels(items) -> str:
+    return ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in items)
+
+
+def render_prometheus() -> str:
+    with _lock:
+        series = sorted((k, list(v)) for k, v in _series.items())
+    lines: List[str] = []
+    last = None
+    for (name, items), row in series:
+        full = PREFIX + name
+        if name != last:
+            lines.append(f"# HELP {full} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {full} histogram")
+            last = name
+        cumulative = 0.0
+        for bound, n in zip(BUCKETS + (float("inf"),), row[:-1]):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{full}_bucket{{{_fmt_labels(items + (('le', le),))}}} {cumulative:g}")
+        lbl = f"{{{_fmt_labels(items)}}}" if items else ""
+        lines.append(f"{full}_sum{lbl} {row[-1]:.6f}")
+        lines.append(f"{full}_count{lbl} {cumulative:g}")
+    return "\n".join(lines) + "\n"
+
+
+def _quantile(row: List[float], count: float, q: float) -> float:
+    """Upper bound of the bucket holding quantile q (the last finite bound for +Inf)."""
+    target, seen = q * count, 0.0
+    for bound, n in zip(BUCKETS, row):
+        seen += n
+        if seen >= target:
+            return bound
+    return BUCKETS[-1]
+
+
+def summary() -> List[Dict[str, object]]:
+    """One row per series with count, mean and bucketed p50/p95, for the debug panel."""
+    with _lock:
+        series = sorted((k, list(v)) for k, v in _series.items())
+    rows = []
+    for (name, items), row in series:
+        count = sum(row[:-1])
+        labels = dict(items)
+        rows.append({
+            "metric": name,
+            "phase": labels.pop("phase", ""),
+            "model": labels.pop("model", ""),
+            "labels": ",".join(f"{k}={v}" for k, v in labels.items()),
+            "count": int(count),
+            "mean_ms": round(row[-1] / count * 1000, 1) if count else 0.0,
+            "p50_ms": _quantile(row, count, 0.5) * 1000,
+            "p95_ms": _quantile(row, count, 0.95) * 1000,
+        })
+    return rows
+
+
+def write_textfile(path: str) -> None:
+    """Atomically write the exposition (node_exporter textfile collector style)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+def serve(port: int, host: str = "127.0.0.1"):
+    """Serve /metrics from a daemon thread; returns the HTTP server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200 if self.path.split("?")[0] in ("/", "/metrics") else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True).start()
+    return httpd
+
+
+_exporter_started = False
+
+
+def start_exporter() -> None:
+    """Start the METRICS_PORT endpoint and METRICS_FILE writer once per process."""
+    global _exporter_started
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    port = os.getenv("METRICS_PORT")
+    if port:
+        try:
+            serve(int(port))
+        except OSError:
+            pass  # another process already owns the port
+    path = os.getenv("METRICS_FILE")
+    if path:
+        interval = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    write_textfile(path)
+                except OSError:
+                    pass
+        threading.Thread(target=loop, name="metrics-file", daemon=True).start()
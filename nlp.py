@@ -1,10 +1,14 @@
 from __future__ import annotations
-from typing import Optional
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from langdetect import detect, DetectorFactory
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+import re
+import threading
 
-_analyzer = SentimentIntensityAnalyzer()
-DetectorFactory.seed = 0
+import sentiment
+from sentiment import analyze_sentiment_vader
+
+_detect = None
+_detect_lock = threading.Lock()
 
 LANG_CODES = {
     "auto": "auto",
@@ -16,20 +20,140 @@ LANG_CODES = {
 
 
 def analyze_sentiment(text: str) -> str:
-    if not text:
-        return "neutral"
-    s = _analyzer.polarity_scores(text)
-    c = s.get("compound", 0)
-    if c >= 0.2:
-        return "positive"
-    if c <= -0.2:
-        return "negative"
-    return "neutral"
+    return analyze_sentiment_vader(text)
 
 
-def detect_language_code(text: str) -> Optional[str]:
-    try:
-        code = detect(text)
+# Names a candidate may type when asked which language to continue in.
+_LANGUAGE_NAMES = {
+    "English": ("english", "eng", "inglés", "ingles", "anglais"),
+    "Spanish": ("spanish", "español", "espanol", "esp", "castellano", "espagnol"),
+    "French": ("french", "français", "francais", "francés", "frances"),
+    "Hindi": ("hindi", "hind", "हिंदी", "हिन्दी"),
+}
+_NAME_TO_LANGUAGE = {name: lang for lang, names in _LANGUAGE_NAMES.items() for name in names}
+
+# Tier 1: a character from one of these scripts settles the language on its own.
+_SCRIPTS = [
+    (0x0900, 0x097F, "hi"),  # Devanagari
+    (0x0600, 0x06FF, "ar"),
+    (0x0400, 0x04FF, "ru"),  # Cyrillic
+    (0x0370, 0x03FF, "el"),
+    (0x0590, 0x05FF, "he"),
+    (0x0E00, 0x0E7F, "th"),
+    (0x3040, 0x30FF, "ja"),  # Hiragana / Katakana, checked before Han
+    (0xAC00, 0xD7AF, "ko"),
+    (0x4E00, 0x9FFF, "zh"),
+]
+_NON_LATIN_RE = re.compile("[" + "".join(f"\\u{lo:04x}-\\u{hi:04x}" for lo, hi, _ in _SCRIPTS) + "]")
+
+# Tier 2: marker characters and common words for the Latin-script languages we support.
+_MARKER_CHARS = {"es": "ñ¿¡", "fr": "çœêèëîïûù"}
+_KEYWORDS = {
+    "en": "the and is are i yes no years year with have has my to of it in that this for you was not experience".split(),
+    "es": "el la los las que de y es con por para una pero muy sí si años año tengo gracias hola yo no experiencia".split(),
+    "fr": "le la les et est je pas avec pour une des oui merci ans j'ai c'est bonjour nous vous expérience".split(),
+}
+_KEYWORD_LANGS: Dict[str, List[str]] = {}
+for _code, _words in _KEYWORDS.items():
+    for _w in _words:
+        _KEYWORD_LANGS.setdefault(_w, []).append(_code)
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+# Tier 3 (langdetect) only runs on text at least this long; short answers such as
+# "yes" or "5 years" are where it is least reliable.
+STATISTICAL_MIN_CHARS = 20
+
+
+def detect_language_input(user_text: str):
+    """Detects language choice from user input."""
+    return _language_choice((user_text or "").strip().lower())
+
+
+@lru_cache(maxsize=1024)
+def _language_choice(text: str) -> Optional[str]:
+    for word in text.replace(",", " ").split():
+        lang = _NAME_TO_LANGUAGE.get(word.strip(".!?¿¡"))
+        if lang:
+            return lang
+    # No language named: take the language the candidate wrote in, if we support it.
+    code = detect_language_code(text)
+    return LANG_CODES.get(code) if code in LANG_CODES and code != "auto" else None
+
+
+def _get_detector():
+    """Import langdetect and load its language profiles on first use."""
+    global _detect
+    if _detect is None:
+        with _detect_lock:
+            if _detect is None:
+                from langdetect import detect, DetectorFactory
+                from langdetect.detector_factory import init_factory
+                DetectorFactory.seed = 0
+                init_factory()
+                _detect = detect
+    return _detect
+
+
+def _script_code(text: str) -> Optional[str]:
+    m = _NON_LATIN_RE.search(text)
+    if m is None:
+        return None
+    cp = ord(m.group())
+    return next(code for lo, hi, code in _SCRIPTS if lo <= cp <= hi)
+
+
+def _keyword_code(text: str) -> Optional[str]:
+    """Best keyword/marker score, if it is unambiguous."""
+    scores = dict.fromkeys(_KEYWORDS, 0)
+    for code, chars in _MARKER_CHARS.items():
+        if any(c in text for c in chars):
+            scores[code] += 2
+    for word in _WORD_RE.findall(text):
+        for code in _KEYWORD_LANGS.get(word, ()):
+            scores[code] += 1
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (best, top), (_, second) = ranked[0], ranked[1]
+    return best if top > second else None
+
+
+@lru_cache(maxsize=8192)
+def _detect_code(text: str) -> Optional[str]:
+    code = _script_code(text)
+    if code:
         return code
+    lowered = text.lower()
+    code = _keyword_code(lowered)
+    if code or len(text) < STATISTICAL_MIN_CHARS:
+        return code
+    try:
+        return _get_detector()(text)
     except Exception:
         return None
+
+
+def detect_language_code(text: str) -> Optional[str]:
+    """ISO 639-1 code of `text`, or None when it is too short or ambiguous to tell.
+
+    Tiers: Unicode script, then marker characters and keywords, then
+    langdetect for longer text only. Results are memoized (bounded LRU).
+    """
+    text = (text or "").strip()
+    return _detect_code(text) if text else None
+
+
+def detect_language_batch(texts: Iterable[str]) -> List[Optional[str]]:
+    """detect_language_code over many texts, e.g. for backfills; repeats cost a lookup."""
+    return [detect_language_code(t) for t in texts]
+
+
+def backfill_transcript_language(messages: List[Dict]) -> int:
+    """Set "lang" on user messages that have none; returns how many were filled."""
+    missing = [m for m in messages if m.get("role") == "user" and not m.get("lang")]
+    for m, code in zip(missing, detect_language_batch(m.get("content") or "" for m in missing)):
+        m["lang"] = code
+    return len(missing)
+
+
+def warm_up() -> None:
+    _get_detector()
+    sentiment.warm_up()
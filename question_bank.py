@@ -0,0 +1,196 @@
+"""Offline question bank compiled into a memory-mapped hash index.
+
+    python question_bank.py                      # compile question_bank.jsonl
+    python question_bank.py --source more.jsonl --out /tmp/bank.idx
+
+Source lines are {"tech", "lang", "band", "questions": [...]}; band is
+junior, mid or senior (see `difficulty_band`). The compiled file is
+
+    header | hash table of (key hash, first question, count) | question offsets | UTF-8 text
+
+so a lookup is one probe into an mmap'd table and only the pages that are
+read become resident. `get_question_bank` recompiles when the source is
+newer than the compiled file.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from storage import DATA_DIR
+from techstack import tech_key
+from utils import parse_years
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_bank.jsonl")
+BANK_PATH = os.path.join(DATA_DIR, "question_bank.idx")
+BANDS = ("junior", "mid", "senior")
+GENERAL = "general"
+
+_MAGIC = b"TSQB"
+_VERSION = 2  # 2: technologies keyed by techstack.tech_key
+_HEADER = struct.Struct("<4sHHIIQQ")  # magic, version, pad, table size, questions, offsets at, text at
+_SLOT = struct.Struct("<QII")  # key hash (0 = empty), first question, count
+_OFFSET = struct.Struct("<I")
+
+
+def difficulty_band(years_of_experience) -> str:
+    """junior below 2 years, mid below 5, senior from 5; unparseable counts as mid."""
+    years = parse_years(years_of_experience)
+    if years is None:
+        return "mid"
+    if years < 2:
+        return "junior"
+    return "mid" if years < 5 else "senior"
+
+
+def _key_hash(tech: str, lang: str, band: str) -> int:
+    key = f"{tech_key(tech)}\0{(lang or '').strip().lower()}\0{band}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") | 1
+
+
+def compile_bank(source: str = SOURCE_PATH, out: str = BANK_PATH) -> int:
+    """Compile a JSONL source into the binary index; returns the number of questions."""
+    groups: Dict[int, Dict[str, None]] = {}  # dicts as ordered sets: drop exact repeats
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            qs = rec.get("questions") or [rec["question"]]
+            group = groups.setdefault(_key_hash(rec["tech"], rec.get("lang", "English"), rec.get("band", "mid")), {})
+            group.update((q.strip(), None) for q in qs if q.strip())
+
+    size = 8
+    while size < 2 * len(groups):
+        size *= 2
+    table = [(0, 0, 0)] * size
+    offsets, blob, n = [], bytearray(), 0
+    for h, qs in groups.items():
+        i = h & (size - 1)
+        while table[i][0]:
+            i = (i + 1) & (size - 1)
+        table[i] = (h, n, len(qs))
+        for q in qs:
+            offsets.append(len(blob))
+            blob += q.encode("utf-8")
+        n += len(qs)
+    offsets.append(len(blob))
+
+    offsets_at = _HEADER.size + size * _SLOT.size
+    text_at = offsets_at + len(offsets) * _OFFSET.size
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    tmp = f"{out}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0, size, n, offsets_at, text_at))
+        f.write(b"".join(_SLOT.pack(*slot) for slot in table))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(blob)
+    os.replace(tmp, out)
+    return n
+
+
+class QuestionBank:
+    """Read-only view of a compiled bank; safe to share between threads."""
+
+    __slots__ = ("path", "_file", "_mm", "table_size", "n_questions", "offsets_at", "text_at")
+
+    def __init__(self, path: str = BANK_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.table_size, self.n_questions, self.offsets_at, self.text_at = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {_VERSION} question bank")
+
+    def __len__(self) -> int:
+        return self.n_questions
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def _range(self, tech: str, lang: str, band: str) -> Tuple[int, int]:
+        h = _key_hash(tech, lang, band)
+        mask = self.table_size - 1
+        i = h & mask
+        while True:
+            slot_hash, start, count = _SLOT.unpack_from(self._mm, _HEADER.size + i * _SLOT.size)
+            if slot_hash == h:
+                return start, count
+            if slot_hash == 0:
+                return 0, 0
+            i = (i + 1) & mask
+
+    def _question(self, i: int) -> str:
+        start, end = struct.unpack_from("<II", self._mm, self.offsets_at + i * _OFFSET.size)
+        return self._mm[self.text_at + start:self.text_at + end].decode("utf-8")
+
+    def questions(self, tech: str, lang: str = "English", band: str = "mid") -> List[str]:
+        start, count = self._range(tech, lang, band)
+        return [self._question(i) for i in range(start, start + count)]
+
+    def pick(self, techs: Iterable[str], lang: str = "English", band: str = "mid", history=()) -> Optional[str]:
+        """A random question in `lang` not in `history`, trying the stack's technologies in
+        random order, nearby bands, and finally general questions. Never another language:
+        without entries for `lang` this is None and the caller uses its translated templates."""
+        techs = list(dict.fromkeys(tech_key(t) for t in techs))
+        random.shuffle(techs)
+        band = band if band in BANDS else "mid"
+        bands = sorted(BANDS, key=lambda b: abs(BANDS.index(b) - BANDS.index(band)))
+        lang = lang or "English"
+        for tech in techs + [GENERAL]:
+            for b in bands:
+                start, count = self._range(tech, lang, b)
+                if not count:
+                    continue
+                first = random.randrange(count)
+                for k in range(count):
+                    q = self._question(start + (first + k) % count)
+                    if q not in history:
+                        return q
+        return None
+
+
+_bank: Optional[QuestionBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    """The shared bank, compiled from SOURCE_PATH first if that is newer; None if unavailable."""
+    global _bank
+    if _bank is not None:
+        return _bank
+    with _bank_lock:
+        if _bank is None:
+            try:
+                if os.path.exists(SOURCE_PATH) and (
+                        not os.path.exists(BANK_PATH) or os.path.getmtime(BANK_PATH) < os.path.getmtime(SOURCE_PATH)):
+                    compile_bank()
+                try:
+                    _bank = QuestionBank()
+                except ValueError:  # written by an older version: rebuild from source
+                    compile_bank()
+                    _bank = QuestionBank()
+            except (OSError, ValueError):
+                return None
+    return _bank
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compile the offline question bank.")
+    ap.add_argument("--source", default=SOURCE_PATH)
+    ap.add_argument("--out", default=BANK_PATH)
+    args = ap.parse_args()
+    n = compile_bank(args.source, args.out)
+    print(f"compiled {n} questions into {args.out} ({os.path.getsize(args.out)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import contextvars
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from storage import DATA_DIR
+from techstack import tech_key
+
+CACHE_PATH = os.path.join(DATA_DIR, "question_cache.sqlite3")
+
+Key = Tuple[str, str, str]
+
+
+def normalize_key(tech: str, lang: str, model: str) -> Key:
+    return (tech_key(tech or ""), (lang or "").strip().lower(), (model or "").strip())
+
+
+class QuestionCache:
+    """Pools of generated questions per (tech, language, model).
+
+    Level 1 is an in-memory LRU with a TTL (so pools written by other
+    processes are picked up); level 2 is a SQLite file shared across
+    processes. Pools smaller than `pool_target` are topped up in the
+    background through the `refill` callable handed to `take`.
+
+    Questions older than `max_age` seconds are deleted. Once a pool's oldest
+    question is half that age it is refreshed early: the refill adds a batch
+    and the pool is trimmed back to its `pool_target` newest questions, so
+    a popular pool keeps rotating instead of serving the same set forever.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = 256, ttl: float = 600.0,
+                 pool_target: int = 20, refill_batch: int = 3, max_age: float = 7 * 86400.0):
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.pool_target = pool_target
+        self.refill_batch = refill_batch
+        # key -> (loaded at, pool, unix time of the pool's oldest question)
+        self._lru: OrderedDict[Key, Tuple[float, List[str], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._refilling: set[Key] = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="question-cache-refill")
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "disk_loads": 0, "refills": 0,
+                       "aged_out": 0, "trimmed": 0}
+        conn = self._conn()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                "tech TEXT NOT NULL, lang TEXT NOT NULL, model TEXT NOT NULL, question TEXT NOT NULL, "
+                "created REAL NOT NULL, PRIMARY KEY (tech, lang, model, question))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection to the cache file: opening one costs more than the query."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5)
+        return conn
+
+    def _pool(self, key: Key) -> Tuple[List[str], float]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._lru.move_to_end(key)
+                    return entry[1], entry[2]
+                del self._lru[key]
+                self._stats["expirations"] += 1
+        conn = self._conn()
+        with conn:
+            aged = conn.execute(
+                "DELETE FROM questions WHERE tech=? AND lang=? AND model=? AND created < ?",
+                (*key, time.time() - self.max_age),
+            ).rowcount
+            rows = conn.execute(
+                "SELECT question, created FROM questions WHERE tech=? AND lang=? AND model=?", key
+            ).fetchall()
+        pool = [r[0] for r in rows]
+        oldest = min((r[1] for r in rows), default=time.time())
+        with self._lock:
+            self._stats["disk_loads"] += 1
+            self._stats["aged_out"] += aged
+            self._lru[key] = (now, pool, oldest)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+                self._stats["evictions"] += 1
+        return pool, oldest
+
+    def take(self, tech: str, lang: str, model: str, history=(), refill: Optional[Callable[[], Iterable[str]]] = None) -> Optional[str]:
+        """Return a cached question not in `history`, or None on a miss.
+
+        `refill` returns a batch of fresh questions for this key.
+        """
+        key = normalize_key(tech, lang, model)
+        pool, oldest = self._pool(key)
+        stale = time.time() - oldest > self.max_age / 2
+        if refill is not None and (len(pool) < self.pool_target or stale):
+            self._schedule_refill(key, refill)
+        candidates = [q for q in pool if q not in history]
+        with self._lock:
+            self._stats["hits" if candidates else "misses"] += 1
+        return random.choice(candidates) if candidates else None
+
+    def add(self, tech: str, lang: str, model: str, question: str) -> None:
+        question = (question or "").strip()
+        if not question:
+            return
+        key = normalize_key(tech, lang, model)
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO questions (tech, lang, model, question, created) VALUES (?, ?, ?, ?, ?)",
+                (*key, question, time.time()),
+            )
+        if cur.rowcount:
+            with self._lock:
+                entry = self._lru.get(key)
+                if entry is not None and question not in entry[1]:
+                    entry[1].append(question)
+
+    def _schedule_refill(self, key: Key, refill: Callable[[], Iterable[str]]) -> None:
+        with self._lock:
+            if key in self._refilling:
+                return
+            self._refilling.add(key)
+            self._stats["refills"] += 1
+        self._executor.submit(contextvars.copy_context().run, self._refill, key, refill)
+
+    def _refill(self, key: Key, refill: Callable[[], Iterable[str]]) -> None:
+        try:
+            for _ in range(self.refill_batch):
+                try:
+                    questions = refill() or []
+                except Exception:
+                    questions = []
+                for q in questions:
+                    self.add(*key, q)
+            self._trim(key)
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+
+    def _trim(self, key: Key) -> None:
+        """Keep the pool's `pool_target` newest questions; the next take reloads it from disk."""
+        conn = self._conn()
+        with conn:
+            trimmed = conn.execute(
+                "DELETE FROM questions WHERE rowid IN (SELECT rowid FROM questions WHERE tech=? AND lang=? AND model=? "
+                "ORDER BY created DESC LIMIT -1 OFFSET ?)", (*key, self.pool_target),
+            ).rowcount
+        if trimmed:
+            with self._lock:
+                self._lru.pop(key, None)
+                self._stats["trimmed"] += trimmed
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            s = dict(self._stats)
+            s["entries"] = len(self._lru)
+        lookups = s["hits"] + s["misses"]
+        s["hit_ratio"] = s["hits"] / lookups if lookups else 0.0
+        return s
+
+
+_default_cache: Optional[QuestionCache] = None
+_default_lock = threading.Lock()
+
+
+def get_question_cache() -> Optional[QuestionCache]:
+    """Process-wide cache, or None when disabled with QUESTION_CACHE=0."""
+    global _default_cache
+    if os.getenv("QUESTION_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = QuestionCache(
+                max_entries=int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "256")),
+                ttl=float(os.getenv("QUESTION_CACHE_TTL", "600")),
+                pool_target=int(os.getenv("QUESTION_CACHE_POOL_SIZE", "20")),
+                max_age=float(os.getenv("QUESTION_CACHE_MAX_AGE", str(7 * 86400))),
+            )
+        return _default_cache
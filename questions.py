@@ -0,0 +1,270 @@
+from __future__ import annotations
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metrics
+import resilience
+from dedupe import QuestionIndex, strip_question_prefix
+from question_bank import get_question_bank
+from question_cache import get_question_cache
+from techstack import parse_stack
+
+TECH_QUESTION_COUNT = 5
+CANDIDATES_PER_CALL = 3
+
+# Shared by every session in the process; question generation is I/O bound.
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PREFETCH_WORKERS", "8")),
+    thread_name_prefix="question-prefetch",
+)
+
+
+def split_tech_stack(tech_stack: str | None) -> List[str]:
+    return list(parse_stack(tech_stack or "")) or ["General Programming"]
+
+
+# Offline templates in every UI language (ui_assets.TRANSLATIONS); {tech} is filled in.
+FALLBACK_TEMPLATES: Dict[str, List[str]] = {
+    "English": [
+        "How do you handle debugging in {tech}?",
+        "What is your approach to unit testing in {tech}?",
+        "Explain a challenging bug you fixed in {tech}.",
+        "How do you manage dependencies in {tech}?",
+        "What are some performance pitfalls in {tech}?",
+        "Describe a design pattern you use in {tech}.",
+        "How do you ensure code quality in {tech} projects?",
+        "What is your favorite feature of {tech} and why?",
+        "How does {tech} handle memory management?",
+        "Explain the difference between synchronous and asynchronous operations in {tech}.",
+    ],
+    "Spanish": [
+        "¿Cómo abordas la depuración en {tech}?",
+        "¿Cuál es tu enfoque para las pruebas unitarias en {tech}?",
+        "Explica un error difícil que hayas corregido en {tech}.",
+        "¿Cómo gestionas las dependencias en {tech}?",
+        "¿Cuáles son algunos problemas de rendimiento habituales en {tech}?",
+        "Describe un patrón de diseño que uses en {tech}.",
+        "¿Cómo garantizas la calidad del código en proyectos de {tech}?",
+        "¿Cuál es tu característica favorita de {tech} y por qué?",
+        "¿Cómo gestiona {tech} la memoria?",
+        "Explica la diferencia entre operaciones síncronas y asíncronas en {tech}.",
+    ],
+    "French": [
+        "Comment abordez-vous le débogage en {tech}?",
+        "Quelle est votre approche des tests unitaires en {tech}?",
+        "Expliquez un bug difficile que vous avez corrigé en {tech}.",
+        "Comment gérez-vous les dépendances en {tech}?",
+        "Quels sont les pièges de performance courants en {tech}?",
+        "Décrivez un patron de conception que vous utilisez en {tech}.",
+        "Comment garantissez-vous la qualité du code dans les projets {tech}?",
+        "Quelle est votre fonctionnalité préférée de {tech}, et pourquoi?",
+        "Comment {tech} gère-t-il la mémoire?",
+        "Expliquez la différence entre les opérations synchrones et asynchrones en {tech}.",
+    ],
+    "Hindi": [
+        "आप {tech} में डिबगिंग कैसे करते हैं?",
+        "{tech} में यूनिट टेस्टिंग के प्रति आपका दृष्टिकोण क्या है?",
+        "{tech} में आपके द्वारा ठीक किए गए किसी कठिन बग के बारे में बताएं।",
+        "आप {tech} में डिपेंडेंसी कैसे मैनेज करते हैं?",
+        "{tech} में प्रदर्शन से जुड़ी कुछ आम गलतियाँ क्या हैं?",
+        "{tech} में आपके द्वारा उपयोग किए जाने वाले किसी डिज़ाइन पैटर्न का वर्णन करें।",
+        "आप {tech} प्रोजेक्ट्स में कोड की गुणवत्ता कैसे सुनिश्चित करते हैं?",
+        "{tech} की आपकी पसंदीदा विशेषता क्या है और क्यों?",
+        "{tech} मेमोरी प्रबंधन कैसे करता है?",
+        "{tech} में सिंक्रोनस और एसिंक्रोनस ऑपरेशनों के बीच अंतर समझाएं।",
+    ],
+}
+
+
+def fallback_questions(tech: str, lang: str = "English") -> List[str]:
+    templates = FALLBACK_TEMPLATES.get(lang) or FALLBACK_TEMPLATES["English"]
+    return [t.format(tech=tech) for t in templates]
+
+
+def generate_local_fallback_question(tech_list, lang: str = "English"):
+    """Expanded templates to reduce duplication chance."""
+    if not tech_list: tech_list = ["software development", "problem solving"]
+    return random.choice(fallback_questions(random.choice(tech_list), lang))
+
+
+def question_messages(tech: str, lang: str, n: int = 1) -> List[Dict[str, str]]:
+    if n == 1:
+        prompt = f"Ask a specific technical question about '{tech}' in {lang}. Short and direct."
+    else:
+        prompt = (
+            f"Ask {n} different specific technical questions about '{tech}' in {lang}. "
+            "Short and direct. One question per line, no numbering."
+        )
+    return [{"role": "system", "content": prompt}]
+
+
+def ask_llm_questions(tech: str, lang: str, model: str, complete: Callable, n: int = CANDIDATES_PER_CALL) -> List[str]:
+    """One LLM call returning up to `n` candidate questions."""
+    resp = complete(question_messages(tech, lang, n), model=model, max_tokens=60 * n)
+    if not resp:
+        return []
+    out = [strip_question_prefix(line) for line in resp.splitlines()]
+    return [q for q in out if q][:n]
+
+
+def _refill_questions(tech: str, lang: str, model: str, complete: Callable) -> List[str]:
+    # Runs on the cache's refill thread: not bound by the turn that triggered it.
+    with resilience.deadline(resilience.QUESTION_DEADLINE):
+        return ask_llm_questions(tech, lang, model, complete)
+
+
+def generate_unique_question(tech_stack, history, lang: str, model: str, complete: Callable, tech: str | None = None,
+                             band: str = "mid"):
+    """
+    Robust generator that GUARANTEES a new question string
+    to force state update and prevent infinite loops.
+
+    `history` may be any iterable of asked questions; near-duplicates of
+    them are rejected. `complete` is the chat completion callable (returns
+    None on failure); `tech` pins the technology instead of picking one.
+    `band` (junior/mid/senior) picks the difficulty of offline questions.
+    """
+    with metrics.timer("question_generation_seconds") as labels:
+        question, labels["source"] = _pick_question(tech_stack, history, lang, model, complete, tech, band)
+        return question
+
+
+def _pick_question(tech_stack, history, lang: str, model: str, complete: Callable, tech: str | None,
+                   band: str) -> Tuple[str, str]:
+    """generate_unique_question's body; also returns where the question came from."""
+    tech_list = split_tech_stack(tech_stack)
+    if tech: tech_list = [tech]
+    seen = history if isinstance(history, QuestionIndex) else QuestionIndex(history)
+    cache = get_question_cache()
+
+    # 0. Try the shared question cache (refilled in the background)
+    if cache is not None:
+        t = random.choice(tech_list)
+        try:
+            cached = cache.take(t, lang, model, seen, refill=lambda: _refill_questions(t, lang, model, complete))
+            if cached: return cached, "cache"
+        except Exception: pass
+
+    # 1. Try LLM (3 attempts, several candidates each; keep the most novel)
+    for _ in range(3):
+        if resilience.expired(): break  # out of time for this turn: go local
+        try:
+            tech = random.choice(tech_list)
+            candidates = ask_llm_questions(tech, lang, model, complete)
+            if cache is not None:
+                for c in candidates: cache.add(tech, lang, model, c)
+            best, score = seen.most_novel(candidates)
+            if best and score < seen.threshold: return best, "llm"
+        except: pass
+
+    # 2. Try the offline question bank (curated, by technology and seniority)
+    bank = get_question_bank()
+    if bank is not None:
+        banked = bank.pick(tech_list, lang, band, seen)
+        if banked: return banked, "bank"
+
+    # 3. Try Fallback (every template, in random order)
+    templates = [f for t in tech_list for f in fallback_questions(t, lang)]
+    random.shuffle(templates)
+    for fallback in templates:
+        if fallback not in seen:
+            return fallback, "fallback"
+
+    # 4. Last Resort: Force uniqueness by appending random ID (prevents infinite "Q1" loop)
+    # This ensures the Set grows, len increases, and Q number advances.
+    base_q = generate_local_fallback_question(tech_list, lang)
+    return f"{base_q} (Variant {random.randint(100, 999)})", "variant"
+
+
+class QuestionPrefetcher:
+    """Generates a session's technical questions in the background.
+
+    One job per question is submitted up front, spread round-robin over the
+    technologies in the stack. `pop` hands out whichever question is ready
+    first and only blocks when none is. Jobs dedupe against the questions
+    the batch has already produced, so a stack with one technology does not
+    come back as five rewordings of the same question.
+    """
+
+    def __init__(self, tech_stack: str, lang: str, model: str, complete: Callable, count: int = TECH_QUESTION_COUNT,
+                 band: str = "mid"):
+        self.tech_stack = tech_stack
+        self.band = band
+        self.lang = lang
+        self.model = model
+        self.complete = complete
+        self.stats: Dict[str, float] = {
+            "submitted": 0, "generated": 0, "failed": 0, "served": 0, "regenerated": 0,
+            "generate_seconds": 0.0, "wait_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+        self._batch = QuestionIndex()
+        techs = split_tech_stack(tech_stack)
+        self._pending: deque[Future] = deque(
+            # copy_context carries the session's metric labels into the worker
+            _executor.submit(contextvars.copy_context().run, self._generate, techs[i % len(techs)]) for i in range(count)
+        )
+        self.stats["submitted"] = count
+
+    def _generate(self, tech: str) -> str:
+        start = time.perf_counter()
+        try:
+            with self._lock:
+                seen = QuestionIndex(self._batch)
+            with resilience.deadline(resilience.QUESTION_DEADLINE):
+                q = generate_unique_question(self.tech_stack, seen, self.lang, self.model, self.complete, tech=tech, band=self.band)
+            with self._lock:
+                self._batch.add(q)
+            return q
+        finally:
+            with self._lock:
+                self.stats["generated"] += 1
+                self.stats["generate_seconds"] += time.perf_counter() - start
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def ready(self) -> bool:
+        return any(f.done() for f in self._pending)
+
+    def pop(self, history) -> str:
+        """Return the next unused question, generating one inline if needed.
+
+        Ready jobs whose question `history` already holds (jobs running at
+        the same time cannot see each other's output) are skipped. Waits at
+        most until the caller's deadline for a pending job.
+        """
+        start = time.perf_counter()
+        q: Optional[str] = None
+        while self._pending and not q:
+            fut = next((f for f in self._pending if f.done()), self._pending[0])
+            self._pending.remove(fut)
+            try:
+                q = fut.result(timeout=resilience.remaining())
+            except FutureTimeout:
+                self._pending.appendleft(fut)  # still generating; serve it on a later turn
+                break
+            except Exception:
+                with self._lock:
+                    self.stats["failed"] += 1
+            if q and q in history:
+                q = None
+        if not q:
+            with self._lock:
+                self.stats["regenerated"] += 1
+            q = generate_unique_question(self.tech_stack, history, self.lang, self.model, self.complete, band=self.band)
+        with self._lock:
+            self.stats["served"] += 1
+            self.stats["wait_seconds"] += time.perf_counter() - start
+        return q
+
+    def cancel(self) -> None:
+        """Drop jobs that have not started; called when the interview ends or its session goes away."""
+        while self._pending:
+            self._pending.popleft().cancel()
@@ -0,0 +1,147 @@
+"""Latency deadlines, hedged calls and a shared circuit breaker for the LLM endpoint.
+
+A turn runs under `deadline(TURN_DEADLINE)`; every LLM attempt inside it
+gets min(ATTEMPT_TIMEOUT, time left), and once the deadline has passed
+callers go straight to the local fallback. The breaker is shared by all
+sessions in the process: after BREAKER_FAILURES consecutive failures it
+opens and calls are refused for BREAKER_RESET seconds, then a single probe
+is let through and its outcome closes or re-opens it.
+"""
+from __future__ import annotations
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+TURN_DEADLINE = float(os.getenv("LLM_TURN_DEADLINE", "8"))
+QUESTION_DEADLINE = float(os.getenv("LLM_QUESTION_DEADLINE", "20"))  # background generation
+ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "4"))
+HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))  # 0 disables hedging
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_deadline", default=None)
+_attempt: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_attempt_timeout", default=None)
+_hedge_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_HEDGE_WORKERS", "16")), thread_name_prefix="llm-hedge")
+
+
+@contextmanager
+def deadline(seconds: float, attempt: Optional[float] = None) -> Iterator[None]:
+    """Bound every LLM call made inside the block to `seconds` in total, and each
+    attempt to `attempt` seconds (default ATTEMPT_TIMEOUT)."""
+    token = _deadline.set(time.monotonic() + seconds)
+    attempt_token = _attempt.set(attempt)
+    try:
+        yield
+    finally:
+        _attempt.reset(attempt_token)
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None when there is none."""
+    d = _deadline.get()
+    return None if d is None else max(0.0, d - time.monotonic())
+
+
+def expired() -> bool:
+    return remaining() == 0.0
+
+
+def attempt_timeout(default: Optional[float] = None) -> float:
+    default = default or _attempt.get() or ATTEMPT_TIMEOUT
+    left = remaining()
+    return default if left is None else min(default, left)
+
+
+def hedged(fn: Callable[[], T], hedge_after: float, timeout: float, backup: Optional[Callable[[], T]] = None) -> T:
+    """Run fn(); if it has not answered after `hedge_after` seconds start `backup`
+    (default: fn again) and return whichever succeeds first. Errors before the
+    hedge point propagate."""
+    if hedge_after <= 0 or hedge_after >= timeout:
+        return fn()
+    started = time.monotonic()
+    first = _hedge_executor.submit(contextvars.copy_context().run, fn)
+    try:
+        return first.result(timeout=hedge_after)
+    except FutureTimeout:
+        pass
+    pending = {first, _hedge_executor.submit(contextvars.copy_context().run, backup or fn)}
+    error: Optional[BaseException] = None
+    while pending:
+        left = timeout - (time.monotonic() - started)
+        done, pending = wait(pending, timeout=max(0.0, left), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for f in done:
+            if f.exception() is None:
+                return f.result()
+            error = f.exception()
+    raise error or TimeoutError(f"no answer within {timeout:.1f}s")
+
+
+class CircuitBreaker:
+    __slots__ = ("name", "failure_threshold", "reset_after", "state", "failures", "opened_at", "stats", "_lock")
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = "half_open"  # let exactly one probe through
+                self.stats["probes"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["opened"] += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {"name": self.name, "state": self.state, "failures": self.failures, **self.stats}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """One breaker per endpoint, shared by every session in the process."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, object]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
@@ -0,0 +1,491 @@
+"""Recruiter search over stored candidates.
+
+    python search.py --tech Python --tech Kubernetes --min-years 5 --location Berlin
+    python search.py --any-tech React --any-tech Vue --not-tech Angular --role frontend --json
+
+An inverted index over each candidate's latest record (one document per
+hashed email). Posting lists are kept per canonical technology
+(techstack), location word, role word and whole year of experience, and
+exact years are checked at the edges of a range. Every posting list is a
+set of roaring-style containers, one per 65536 document ids: a sorted
+array of the low 16 bits while sparse, a 65536-bit int bitmap once dense.
+Intersections and unions therefore run container by container, mostly as
+single big-int operations.
+
+The index catches up from the storage index (`records.seq` past its
+checkpoint) before answering, and is saved to SEARCH_INDEX_PATH so a fresh
+process only reads what was stored since the last save.
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from contextlib import closing
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import storage
+from techstack import tech_key
+from utils import normalize_profile, parse_tech_stack, parse_years
+
+SEARCH_INDEX_PATH = os.path.join(storage.DATA_DIR, "search.idx")
+REFRESH_INTERVAL = float(os.getenv("SEARCH_REFRESH_INTERVAL", "5"))  # seconds between catch-ups when serving
+SAVE_EVERY = 1000  # changed documents before the in-process index is saved again
+MAX_YEARS = 40
+
+ARRAY_MAX = 4096  # past this many ids a container becomes a bitmap (the Roaring threshold)
+_BITMAP_BYTES = 65536 // 8
+_MAGIC = b"TSSX"
+_VERSION = 3  # 2: years parsed with utils.parse_years; 3: ...anywhere in free text
+_HEADER = struct.Struct("<4sHHqII")  # magic, version, pad, checkpoint seq, documents, terms
+_WORD_RE = re.compile(r"\w+")
+
+Container = Union[array, int]
+
+
+def _to_bitmap(ids: Iterable[int]) -> int:
+    bits = bytearray(_BITMAP_BYTES)
+    for lo in ids:
+        bits[lo >> 3] |= 1 << (lo & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _bits(bitmap: int) -> Iterator[int]:
+    for i, byte in enumerate(bitmap.to_bytes(_BITMAP_BYTES, "little")):
+        while byte:
+            low = byte & -byte
+            yield (i << 3) | (low.bit_length() - 1)
+            byte ^= low
+
+
+def _from_bitmap(bitmap: int) -> Container:
+    return array("H", _bits(bitmap)) if bitmap.bit_count() <= ARRAY_MAX else bitmap
+
+
+def _size(c: Container) -> int:
+    return c.bit_count() if isinstance(c, int) else len(c)
+
+
+# Query results stay bitmaps when both sides are: turning a sparse one back into
+# an array costs more in Python than the int operations it would save.
+
+def _and(a: Container, b: Container) -> Optional[Container]:
+    if isinstance(a, int) and isinstance(b, int):
+        return (a & b) or None
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        bits = b.to_bytes(_BITMAP_BYTES, "little")
+        r = array("H", (lo for lo in a if bits[lo >> 3] >> (lo & 7) & 1))
+    else:
+        r = array("H", sorted(set(a).intersection(b)))
+    return r or None
+
+
+def _or(a: Container, b: Container) -> Container:
+    if isinstance(a, int) or isinstance(b, int) or len(a) + len(b) > ARRAY_MAX:
+        return (a if isinstance(a, int) else _to_bitmap(a)) | (b if isinstance(b, int) else _to_bitmap(b))
+    return array("H", sorted(set(a).union(b)))
+
+
+def _and_not(a: Container, b: Container) -> Optional[Container]:
+    if isinstance(a, int):
+        return (a & ~(b if isinstance(b, int) else _to_bitmap(b))) or None
+    if isinstance(b, int):
+        bits = b.to_bytes(_BITMAP_BYTES, "little")
+        r = array("H", (lo for lo in a if not bits[lo >> 3] >> (lo & 7) & 1))
+    else:
+        r = array("H", sorted(set(a).difference(b)))
+    return r or None
+
+
+class Postings:
+    """Document ids of one term, as {id >> 16: container of the low 16 bits}."""
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks: Optional[Dict[int, Container]] = None):
+        self.chunks: Dict[int, Container] = chunks or {}
+
+    def __len__(self) -> int:
+        return sum(_size(c) for c in self.chunks.values())
+
+    def add(self, doc: int) -> None:
+        hi, lo = doc >> 16, doc & 0xFFFF
+        c = self.chunks.get(hi)
+        if c is None:
+            self.chunks[hi] = array("H", [lo])
+        elif isinstance(c, int):
+            self.chunks[hi] = c | (1 << lo)
+        else:
+            i = bisect_left(c, lo)
+            if i == len(c) or c[i] != lo:
+                c.insert(i, lo)
+                if len(c) > ARRAY_MAX:
+                    self.chunks[hi] = _to_bitmap(c)
+
+    def discard(self, doc: int) -> None:
+        hi, lo = doc >> 16, doc & 0xFFFF
+        c = self.chunks.get(hi)
+        if c is None:
+            return
+        if isinstance(c, int):
+            c = _from_bitmap(c & ~(1 << lo))
+        else:
+            i = bisect_left(c, lo)
+            if i < len(c) and c[i] == lo:
+                del c[i]
+        if _size(c):
+            self.chunks[hi] = c
+        else:
+            del self.chunks[hi]
+
+    def __and__(self, other: "Postings") -> "Postings":
+        small, big = (self, other) if len(self.chunks) <= len(other.chunks) else (other, self)
+        out = {}
+        for hi, c in small.chunks.items():
+            d = big.chunks.get(hi)
+            r = _and(c, d) if d is not None else None
+            if r is not None:
+                out[hi] = r
+        return Postings(out)
+
+    def __or__(self, other: "Postings") -> "Postings":
+        out = dict(self.chunks)
+        for hi, c in other.chunks.items():
+            out[hi] = _or(out[hi], c) if hi in out else c
+        return Postings(out)
+
+    def __sub__(self, other: "Postings") -> "Postings":
+        out = {}
+        for hi, c in self.chunks.items():
+            d = other.chunks.get(hi)
+            r = _and_not(c, d) if d is not None else c
+            if r is not None:
+                out[hi] = r
+        return Postings(out)
+
+    def __iter__(self) -> Iterator[int]:
+        for hi in sorted(self.chunks):
+            c = self.chunks[hi]
+            for lo in (_bits(c) if isinstance(c, int) else c):
+                yield (hi << 16) | lo
+
+    def reversed(self) -> Iterator[int]:
+        for hi in sorted(self.chunks, reverse=True):
+            c = self.chunks[hi]
+            los = list(_bits(c)) if isinstance(c, int) else c
+            for lo in reversed(los):
+                yield (hi << 16) | lo
+
+    def to_bytes(self) -> bytes:
+        parts = [struct.pack("<I", len(self.chunks))]
+        for hi, c in sorted(self.chunks.items()):
+            if isinstance(c, int):
+                parts += [struct.pack("<IBI", hi, 1, _BITMAP_BYTES), c.to_bytes(_BITMAP_BYTES, "little")]
+            else:
+                parts += [struct.pack("<IBI", hi, 0, len(c) * 2), c.tobytes()]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, pos: int = 0) -> Tuple["Postings", int]:
+        (n,), pos = struct.unpack_from("<I", data, pos), pos + 4
+        chunks: Dict[int, Container] = {}
+        for _ in range(n):
+            hi, kind, size = struct.unpack_from("<IBI", data, pos)
+            pos += 9
+            raw = data[pos:pos + size]
+            pos += size
+            if kind:
+                chunks[hi] = int.from_bytes(raw, "little")
+            else:
+                chunks[hi] = array("H")
+                chunks[hi].frombytes(raw)
+        return cls(chunks), pos
+
+
+def _first(n: int) -> Postings:
+    """Postings of the document ids 0..n-1."""
+    chunks: Dict[int, Container] = {hi: (1 << 65536) - 1 for hi in range(n >> 16)}
+    if n & 0xFFFF:
+        chunks[n >> 16] = (1 << (n & 0xFFFF)) - 1
+    return Postings(chunks)
+
+
+def _words(text: Any) -> List[str]:
+    return _WORD_RE.findall(str(text or "").lower())
+
+
+def profile_terms(profile: Dict[str, Any]) -> Tuple[List[str], float]:
+    """Index terms of a stored profile, and its years of experience (nan if unknown)."""
+    p = normalize_profile(profile)
+    terms = [f"tech:{tech_key(t)}" for t in parse_tech_stack(str(p.get("tech_stack") or ""))]
+    terms += [f"loc:{w}" for w in dict.fromkeys(_words(p.get("current_location")))]
+    terms += [f"role:{w}" for w in dict.fromkeys(_words(p.get("desired_positions")))]
+    years = parse_years(p.get("years_of_experience"))
+    if years is None:
+        return terms, math.nan
+    terms.append(f"yoe:{min(int(years), MAX_YEARS)}")
+    return terms, years
+
+
+class SearchIndex:
+    def __init__(self):
+        self.keys: List[str] = []  # doc id -> hashed email
+        self.doc_ids: Dict[str, int] = {}
+        self.years = array("d")
+        self.doc_terms: List[array] = []  # term ids per document, to retract them on update
+        self.terms: List[str] = []
+        self.term_ids: Dict[str, int] = {}
+        self.postings: List[Postings] = []
+        self.checkpoint = -1  # records.seq already indexed (the first record has seq 0)
+        self.changed = 0
+        self.refreshed_at = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _term_id(self, term: str) -> int:
+        tid = self.term_ids.get(term)
+        if tid is None:
+            tid = self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+            self.postings.append(Postings())
+        return tid
+
+    def upsert(self, hashed_email: str, profile: Dict[str, Any]) -> None:
+        """(Re)index the latest profile of one candidate."""
+        terms, years = profile_terms(profile)
+        with self._lock:
+            tids = array("I", sorted({self._term_id(t) for t in terms}))
+            doc = self.doc_ids.get(hashed_email)
+            if doc is None:
+                doc = self.doc_ids[hashed_email] = len(self.keys)
+                self.keys.append(hashed_email)
+                self.years.append(years)
+                self.doc_terms.append(array("I"))
+            old = self.doc_terms[doc]
+            if old == tids and (self.years[doc] == years or (math.isnan(years) and math.isnan(self.years[doc]))):
+                return
+            for tid in set(old).difference(tids):
+                self.postings[tid].discard(doc)
+            for tid in set(tids).difference(old):
+                self.postings[tid].add(doc)
+            self.doc_terms[doc] = tids
+            self.years[doc] = years
+            self.changed += 1
+
+    def refresh(self) -> int:
+        """Index every candidate stored since the checkpoint; returns how many were (re)indexed."""
+        with self._lock:
+            storage.update_index()
+            with closing(storage.open_index()) as conn:
+                top = conn.execute("SELECT MAX(seq) FROM records").fetchone()[0]
+                if top is None or top <= self.checkpoint:
+                    self.refreshed_at = time.monotonic()
+                    return 0
+                # The candidates touched since the checkpoint, each at its latest record.
+                rows = conn.execute(
+                    "SELECT hashed_email, segment, offset, item, MAX(seq) FROM records WHERE hashed_email IN "
+                    "(SELECT hashed_email FROM records WHERE seq > ? AND seq <= ?) GROUP BY hashed_email",
+                    (self.checkpoint, top)).fetchall()
+            where = {(seg, off, item): hashed for hashed, seg, off, item, _ in rows}
+            missed = []
+            for loc, record in storage.read_records(list(where)):
+                if record is None:
+                    missed.append(where[loc])  # moved by compaction meanwhile: look it up again
+                else:
+                    self.upsert(where[loc], record.get("profile") or {})
+            for hashed in missed:
+                profile = storage.load_last_profile(hashed)
+                if profile is not None:
+                    self.upsert(hashed, profile)
+            self.checkpoint = top
+            self.refreshed_at = time.monotonic()
+            return len(rows)
+
+    def _term(self, term: str) -> Postings:
+        tid = self.term_ids.get(term)
+        return self.postings[tid] if tid is not None else Postings()
+
+    def _all_of(self, terms: List[str]) -> Optional[Postings]:
+        lists = sorted((self._term(t) for t in terms), key=len)
+        if not lists:
+            return None
+        result = lists[0]
+        for p in lists[1:]:
+            result = result & p
+            if not result.chunks:
+                break
+        return result
+
+    def _years(self, min_years: Optional[float], max_years: Optional[float]) -> Postings:
+        lo = max(0, int(min_years or 0))
+        hi = min(MAX_YEARS, int(max_years) if max_years is not None else MAX_YEARS)
+        result = Postings()
+        for y in range(lo, hi + 1):
+            result = result | self._term(f"yoe:{y}")
+        # Whole-year buckets are exact except at fractional edges.
+        outside = Postings()
+        for y in {lo, hi}:
+            for doc in self._term(f"yoe:{y}"):
+                v = self.years[doc]
+                if (min_years is not None and v < min_years) or (max_years is not None and v > max_years):
+                    outside.add(doc)
+        return result - outside
+
+    def query(self, tech: Iterable[str] = (), any_tech: Iterable[str] = (), not_tech: Iterable[str] = (),
+              location: str = "", role: str = "", min_years: Optional[float] = None,
+              max_years: Optional[float] = None) -> Postings:
+        """Candidates with every `tech`, at least one of `any_tech`, none of `not_tech`, every word
+        of `location` and `role`, and years of experience within [min_years, max_years]."""
+        required = [f"tech:{tech_key(t)}" for t in tech if t.strip()]
+        required += [f"loc:{w}" for w in _words(location)] + [f"role:{w}" for w in _words(role)]
+        with self._lock:
+            result = self._all_of(required)
+            if any_tech:
+                alternatives = Postings()
+                for t in any_tech:
+                    alternatives = alternatives | self._term(f"tech:{tech_key(t)}")
+                result = alternatives if result is None else result & alternatives
+            if min_years is not None or max_years is not None:
+                years = self._years(min_years, max_years)
+                result = years if result is None else result & years
+            if result is None:  # no positive condition: everyone
+                result = _first(len(self.keys))
+            for t in not_tech:
+                result = result - self._term(f"tech:{tech_key(t)}")
+            return result
+
+    def search(self, limit: int = 20, **conditions) -> Dict[str, Any]:
+        """{"total", "candidates": [{"hashed_email", "profile"}]}, newest candidates first."""
+        started = time.perf_counter()
+        result = self.query(**conditions)
+        total = len(result)
+        query_ms = (time.perf_counter() - started) * 1000
+        candidates = []
+        for doc in result.reversed():
+            if len(candidates) >= limit:
+                break
+            hashed = self.keys[doc]
+            candidates.append({"hashed_email": hashed, "profile": storage.load_last_profile(hashed)})
+        return {"total": total, "query_ms": round(query_ms, 3), "candidates": candidates}
+
+    def save(self, path: str = SEARCH_INDEX_PATH) -> None:
+        with self._lock:
+            offsets = array("I", [0])
+            flat = array("I")
+            for tids in self.doc_terms:
+                flat.extend(tids)
+                offsets.append(len(flat))
+            sections = [
+                json.dumps(self.keys).encode("utf-8"), self.years.tobytes(), offsets.tobytes(), flat.tobytes(),
+                json.dumps(self.terms, ensure_ascii=False).encode("utf-8"),
+                b"".join(p.to_bytes() for p in self.postings),
+            ]
+            header = _HEADER.pack(_MAGIC, _VERSION, 0, self.checkpoint, len(self.keys), len(self.terms))
+            self.changed = 0
+        body = b"".join(struct.pack("<Q", len(s)) + s for s in sections)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header + zlib.compress(body, 1))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = SEARCH_INDEX_PATH) -> "SearchIndex":
+        """The saved index, or an empty one if there is none (or it is from another version)."""
+        index = cls()
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, _, checkpoint, n_docs, n_terms = _HEADER.unpack_from(data, 0)
+            if magic != _MAGIC or version != _VERSION:
+                return index
+            body = zlib.decompress(data[_HEADER.size:])
+        except (OSError, struct.error, zlib.error):
+            return index
+        sections, pos = [], 0
+        while pos < len(body):
+            (size,) = struct.unpack_from("<Q", body, pos)
+            sections.append(body[pos + 8:pos + 8 + size])
+            pos += 8 + size
+        keys, years, offsets, flat, terms, postings = sections
+        index.keys = json.loads(keys)
+        index.doc_ids = {k: i for i, k in enumerate(index.keys)}
+        index.years.frombytes(years)
+        offs, ids = array("I"), array("I")
+        offs.frombytes(offsets)
+        ids.frombytes(flat)
+        index.doc_terms = [ids[offs[i]:offs[i + 1]] for i in range(n_docs)]
+        index.terms = json.loads(terms)
+        index.term_ids = {t: i for i, t in enumerate(index.terms)}
+        pos = 0
+        for _ in range(n_terms):
+            p, pos = Postings.from_bytes(postings, pos)
+            index.postings.append(p)
+        index.checkpoint = checkpoint
+        return index
+
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """The shared index, caught up with the store at most every SEARCH_REFRESH_INTERVAL seconds."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex.load()
+        index = _index
+    if time.monotonic() - index.refreshed_at >= REFRESH_INTERVAL:
+        index.refresh()
+        if index.changed >= SAVE_EVERY:
+            index.save()
+    return index
+
+
+def search(limit: int = 20, **conditions) -> Dict[str, Any]:
+    return get_search_index().search(limit, **conditions)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Search stored candidates.")
+    ap.add_argument("--tech", action="append", default=[], help="required technology (repeatable)")
+    ap.add_argument("--any-tech", action="append", default=[], help="at least one of these (repeatable)")
+    ap.add_argument("--not-tech", action="append", default=[], help="excluded technology (repeatable)")
+    ap.add_argument("--location", default="")
+    ap.add_argument("--role", default="")
+    ap.add_argument("--min-years", type=float)
+    ap.add_argument("--max-years", type=float)
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--rebuild", action="store_true", help="ignore the saved index and index the whole store")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    index = SearchIndex() if args.rebuild else SearchIndex.load()
+    index.refresh()
+    if index.changed:
+        index.save()
+    out = index.search(args.limit, tech=args.tech, any_tech=args.any_tech, not_tech=args.not_tech,
+                       location=args.location, role=args.role, min_years=args.min_years, max_years=args.max_years)
+    if args.json:
+        print(json.dumps(out, indent=2, ensure_ascii=False))
+        return
+    print(f"{out['total']} of {len(index)} candidates ({out['query_ms']:.2f} ms)")
+    for c in out["candidates"]:
+        p = c["profile"] or {}
+        print(f"  {p.get('full_name', '?'):<24} {p.get('years_of_experience', ''):>5}  "
+              f"{p.get('current_location', ''):<16} {p.get('desired_positions', '')}  [{p.get('tech_stack', '')}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+POSITIVE_WORDS = ["yes", "sure", "confident", "good", "great", "love", "proficient", "experienced", "excited", "definitely", "absolutely", "strong", "enjoy", "passionate", "proud", "expert", "skilled", "start"]
+NEGATIVE_WORDS = ["no", "not", "bad", "hate", "struggle", "unsure", "weak", "never", "confused", "difficult", "boring", "scared", "worst", "don't know", "don’t know"]
+
+_POLARITY: Dict[str, int] = {**{w: 1 for w in POSITIVE_WORDS}, **{w: -1 for w in NEGATIVE_WORDS}}
+# One pass over the text; longest alternatives first so "don't know" wins over shorter words.
+_RULES_RE = re.compile(
+    r"(?<!\w)(" + "|".join(re.escape(w) for w in sorted(_POLARITY, key=len, reverse=True)) + r")(?!\w)"
+)
+
+VADER_THRESHOLD = 0.2
+_analyzer = None
+
+
+def analyze_sentiment(text: str) -> str:
+    """Rule-based sentiment: counts distinct positive vs. negative keywords."""
+    if not text: return "neutral"
+    found = set(_RULES_RE.findall(text.lower()))
+    score = sum(_POLARITY[w] for w in found)
+    if score > 0: return "positive"
+    if score < 0: return "negative"
+    return "neutral"
+
+
+def _get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def warm_up() -> None:
+    _get_analyzer()
+
+
+@lru_cache(maxsize=4096)
+def analyze_sentiment_vader(text: str) -> str:
+    if not text:
+        return "neutral"
+    c = _get_analyzer().polarity_scores(text).get("compound", 0)
+    if c >= VADER_THRESHOLD:
+        return "positive"
+    if c <= -VADER_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def analyze_batch(texts: Iterable[str], method: str = "rules") -> List[str]:
+    """Score many messages at once; repeated texts are only scored once."""
+    fn = analyze_sentiment_vader if method == "vader" else analyze_sentiment
+    memo: Dict[str, str] = {}
+    out = []
+    for t in texts:
+        label = memo.get(t)
+        if label is None:
+            label = memo[t] = fn(t)
+        out.append(label)
+    return out
+
+
+def backfill_transcript(messages: List[Dict], method: str = "rules") -> int:
+    """Label user messages that have no sentiment yet; returns how many were filled."""
+    missing = [m for m in messages if m.get("role") == "user" and not m.get("sentiment")]
+    for m, label in zip(missing, analyze_batch((m.get("content") or "" for m in missing), method)):
+        m["sentiment"] = label
+    return len(missing)
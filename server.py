@@ -0,0 +1,375 @@
+"""Asyncio HTTP/WebSocket front end for InterviewSession.
+
+    python server.py --port 8080
+
+REST:
+    POST   /sessions                  {"model"?, "consent"?}   -> session snapshot
+    GET    /sessions/{id}                                      -> session snapshot
+    POST   /sessions/{id}/messages    {"text": "..."}          -> {"reply", "phase", "ended"}
+    GET    /sessions/{id}/transcript                           -> {"profile", "timestamp", "chat"}
+    GET    /sessions/{id}/grades                               -> {"grades": [...]} (see grading.py)
+    DELETE /sessions/{id}                                      (also deletes its journal)
+    POST   /search                    {"tech"?, "any_tech"?, "not_tech"?, "location"?, "role"?,
+                                       "min_years"?, "max_years"?, "limit"?} -> {"total", "candidates"}
+    GET    /healthz
+    GET    /metrics                   Prometheus text format (see metrics.py)
+
+WebSocket (/sessions/{id}/ws): send the candidate's text as a text frame;
+the server answers with JSON frames, {"delta": "..."} while a question
+streams and a final {"reply": "...", "phase": ..., "ended": ...}.
+
+Only the standard library is used. Sessions live in memory and idle ones
+are dropped after SESSION_TTL seconds; a session that is not in memory
+(after a restart, or on another worker) is restored from its turn journal; blocking engine calls (LLM, disk)
+run on a thread pool so one event loop can hold thousands of interviews.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import compaction
+import grading
+import metrics
+import resilience
+import search
+import storage
+from endpoints import endpoint_stats
+from session import InterviewSession
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", "3600"))
+MAX_BODY = 64 * 1024
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+            431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    """A request that cannot be parsed; answered with `status` and the connection is closed."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class InterviewServer:
+    def __init__(self, workers: int = 64):
+        self.sessions: Dict[str, InterviewSession] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="interview")
+
+    # --- session operations -------------------------------------------------
+
+    def create(self, model: str | None = None, consent: bool = False) -> InterviewSession:
+        s = InterviewSession(model=model, consent=consent)
+        self.sessions[s.session_id] = s
+        self.locks[s.session_id] = asyncio.Lock()
+        return s
+
+    async def get(self, session_id: str) -> InterviewSession | None:
+        """A live session, or one restored from its journal after a restart (replayed off the event loop)."""
+        s = self.sessions.get(session_id)
+        if s is None:
+            loop = asyncio.get_running_loop()
+            s = await loop.run_in_executor(self.executor, InterviewSession.restore, session_id)
+            if s is not None:
+                # Another request may have restored it while this one was replaying.
+                s = self.sessions.setdefault(session_id, s)
+                self.locks.setdefault(session_id, asyncio.Lock())
+        return s
+
+    def drop(self, session_id: str) -> bool:
+        self.locks.pop(session_id, None)
+        s = self.sessions.pop(session_id, None)
+        if s is not None:
+            s.close()
+        return s is not None
+
+    async def turn(self, s: InterviewSession, text: str, on_delta=None) -> Dict[str, Any] | None:
+        """Run one candidate turn off the event loop; `on_delta` receives streamed text.
+        None if the session was dropped (sweep, DELETE) before the turn got its lock."""
+        loop = asyncio.get_running_loop()
+        lock = self.locks.get(s.session_id)
+        if lock is None:
+            return None
+        async with lock:
+            if self.sessions.get(s.session_id) is not s:
+                return None
+            stream = on_delta is not None
+            reply = await loop.run_in_executor(self.executor, s.handle, text, stream)
+            if reply is not None and not isinstance(reply, str):
+                queue: asyncio.Queue = asyncio.Queue()
+
+                def drain(tokens) -> str:
+                    parts = []
+                    try:
+                        for tok in tokens:
+                            parts.append(tok)
+                            loop.call_soon_threadsafe(queue.put_nowait, tok)
+                    except Exception:
+                        parts = []  # broke off mid-stream: finish_stream serves a prefetched question
+                    finally:
+                        loop.call_soon_threadsafe(queue.put_nowait, None)
+                    return "".join(parts)
+
+                drained = loop.run_in_executor(self.executor, drain, reply)
+                try:
+                    await on_delta(s.next_question_label())
+                    while (tok := await queue.get()) is not None:
+                        await on_delta(tok)
+                finally:
+                    # Commit the question even if the client went away mid-stream.
+                    reply = await loop.run_in_executor(self.executor, s.finish_stream, await drained)
+            return {"reply": reply, "phase": s.phase, "ended": s.ended}
+
+    async def search_candidates(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        try:
+            conditions: Dict[str, Any] = {}
+            for k in ("tech", "any_tech", "not_tech"):
+                techs = payload.get(k) or []
+                conditions[k] = [techs] if isinstance(techs, str) else [str(t) for t in techs]
+            conditions.update(location=str(payload.get("location") or ""), role=str(payload.get("role") or ""))
+            for k in ("min_years", "max_years"):
+                conditions[k] = float(payload[k]) if payload.get(k) is not None else None
+            limit = max(0, min(500, int(payload.get("limit", 20))))
+        except (TypeError, ValueError):
+            return 400, {"error": "tech, any_tech and not_tech must be lists; min_years, max_years and limit numbers"}
+        loop = asyncio.get_running_loop()
+        return 200, await loop.run_in_executor(self.executor, lambda: search.search(limit, **conditions))
+
+    async def sweep(self) -> None:
+        while True:
+            await asyncio.sleep(min(60.0, SESSION_TTL))
+            cutoff = time.monotonic() - SESSION_TTL
+            for sid in [sid for sid, s in self.sessions.items() if s.last_active < cutoff]:
+                self.drop(sid)
+
+    # --- HTTP -----------------------------------------------------------------
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    req = await read_request(reader)
+                except BadRequest as e:
+                    write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if req is None:
+                    break
+                method, path, headers, body = req
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self.websocket(path, headers, reader, writer)
+                    break
+                try:
+                    status, payload = await self.route(method, path, body)
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Optional[Any]]:
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "invalid JSON"}
+        if parts == ["healthz"]:
+            return 200, {"status": "ok", "sessions": len(self.sessions), "llm_breakers": resilience.breaker_stats(),
+                         "llm_endpoints": endpoint_stats(), "compaction": compaction.compaction_stats(),
+                         "grading": grading.grading_stats()}
+        if parts == ["metrics"]:
+            return 200, metrics.render_prometheus()
+        if parts == ["search"] and method == "POST":
+            return await self.search_candidates(payload)
+        if parts == ["sessions"] and method == "POST":
+            s = self.create(payload.get("model"), bool(payload.get("consent")))
+            return 201, s.snapshot()
+        if len(parts) >= 2 and parts[0] == "sessions":
+            s = await self.get(parts[1])
+            if s is None:
+                return 404, {"error": "unknown session"}
+            if len(parts) == 2 and method == "GET":
+                return 200, s.snapshot()
+            if len(parts) == 2 and method == "DELETE":
+                self.drop(s.session_id)
+                s.journal.discard()
+                return 204, None
+            if parts[2:] == ["transcript"] and method == "GET":
+                return 200, s.journal.transcript(s.profile)
+            if parts[2:] == ["grades"] and method == "GET":
+                return 200, {"grades": storage.load_grades(session_id=s.session_id)}
+            if parts[2:] == ["messages"] and method == "POST":
+                text = str(payload.get("text") or "").strip()
+                if not text:
+                    return 400, {"error": "text is required"}
+                if s.ended:
+                    return 409, {"error": "interview has ended"}
+                out = await self.turn(s, text)
+                return (200, out) if out is not None else (404, {"error": "unknown session"})
+            return 405, {"error": "method not allowed"}
+        return 404, {"error": "not found"}
+
+    # --- WebSocket ------------------------------------------------------------
+
+    async def websocket(self, path: str, headers: Dict[str, str], reader, writer) -> None:
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        s = await self.get(parts[1]) if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "ws" else None
+        key = headers.get("sec-websocket-key")
+        if s is None or not key:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+
+        async def send(obj: Dict[str, Any]) -> None:
+            writer.write(ws_frame(0x1, json.dumps(obj, ensure_ascii=False).encode("utf-8")))
+            await writer.drain()
+
+        await send(s.snapshot())
+        while True:
+            opcode, data = await read_ws_frame(reader)
+            if opcode == 0x8:
+                writer.write(ws_frame(0x8, data[:2]))
+                await writer.drain()
+                return
+            if opcode == 0x9:
+                writer.write(ws_frame(0xA, data))
+                await writer.drain()
+                continue
+            if opcode != 0x1:
+                continue
+            text = data.decode("utf-8", "replace").strip()
+            if not text or s.ended:
+                await send({"error": "interview has ended" if s.ended else "text is required"})
+                continue
+            out = await self.turn(s, text, on_delta=lambda tok: send({"delta": tok}))
+            if out is None:
+                await send({"error": "unknown session"})
+                return
+            await send(out)
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool = True) -> None:
+    if isinstance(payload, str):
+        data, ctype = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    elif isinstance(payload, bytes):
+        data, ctype = payload, "application/json"  # already-encoded JSON
+    else:
+        data = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        ctype = "application/json"
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: {ctype}\r\nContent-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("ascii") + data
+    )
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """(method, path, headers, body), None at end of stream; BadRequest if it cannot be parsed."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise BadRequest(431, "request headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest(400, "malformed request")
+    if length < 0:
+        raise BadRequest(400, "malformed request")
+    if length > MAX_BODY:
+        raise BadRequest(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def ws_frame(opcode: int, payload: bytes) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+async def read_ws_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Read one (possibly fragmented) message; returns (opcode, payload)."""
+    opcode, chunks = None, []
+    while True:
+        b1, b2 = await reader.readexactly(2)
+        n = b2 & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if n > MAX_BODY:
+            raise ConnectionError("frame too large")
+        mask = await reader.readexactly(4) if b2 & 0x80 else None
+        data = await reader.readexactly(n)
+        if mask:
+            data = bytes(c ^ mask[i % 4] for i, c in enumerate(data))
+        op = b1 & 0x0F
+        if op >= 0x8:
+            return op, data  # control frames are never fragmented
+        if opcode is None:
+            opcode = op
+        chunks.append(data)
+        if b1 & 0x80:
+            return opcode, b"".join(chunks)
+
+
+async def serve(host: str, port: int, workers: int) -> None:
+    app = InterviewServer(workers=workers)
+    server = await asyncio.start_server(app.handle_connection, host, port, limit=MAX_BODY)
+    asyncio.create_task(app.sweep())
+    compaction.start_background_compaction()
+    print(f"TalentScout interview server on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serve InterviewSession over HTTP and WebSocket.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=64, help="threads for blocking LLM/disk calls")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Headless interview state machine.
+
+InterviewSession holds everything one candidate's interview needs and no
+UI: the Streamlit app and the asyncio server in server.py both drive it
+through `handle`.
+"""
+from __future__ import annotations
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import grading
+import journal
+import metrics
+import resilience
+import storage
+from dedupe import QuestionIndex
+from llm_client import default_model, try_chat_completion
+from nlp import detect_language_code, detect_language_input
+from question_bank import difficulty_band
+from questions import QuestionPrefetcher, TECH_QUESTION_COUNT, question_messages, split_tech_stack
+from sentiment import analyze_sentiment
+from ui_assets import TRANSLATIONS
+
+LANGUAGE_PROMPT = "👋 Hello! In which language would you like to continue? (English, Spanish, French, Hindi)"
+LANGUAGE_RETRY = "I didn't catch that. Please choose: English, Spanish, French, or Hindi."
+END_TRIGGERS = {"bye", "exit", "quit", "stop", "thank you", "thanks", "done", "end"}
+INTRO_TRIGGERS = ["yes", "y", "start", "sure", "ok", "go", "empezar", "commencer", "shuru", "si", "oui", "haan"]
+PROFILE_CHECKS = [
+    ("full_name", "q_name"), ("email", "q_email"), ("phone", "q_phone"),
+    ("desired_positions", "q_role"), ("years_of_experience", "q_yoe"),
+    ("current_location", "q_loc"), ("tech_stack", "q_stack"),
+]
+
+
+def is_end_message(text: str) -> bool:
+    """Checks if the user wants to end the conversation."""
+    if not text: return False
+    return text.lower().strip().strip(".,!") in END_TRIGGERS
+
+
+def empty_profile() -> Dict[str, str]:
+    return {key: "" for key, _ in PROFILE_CHECKS}
+
+
+class InterviewSession:
+    __slots__ = (
+        "session_id", "language", "language_confirmed", "intro_ack", "profile", "messages",
+        "current_field", "phase", "tech_start_idx", "asked", "ended", "prefetcher",
+        "model", "consent", "complete", "last_active", "journal", "stream_started",
+    )
+
+    def __init__(self, session_id: str | None = None, model: str | None = None, consent: bool = False,
+                 complete: Callable = try_chat_completion):
+        self.session_id = session_id or str(uuid.uuid4())
+        self.language = "English"
+        self.language_confirmed = False
+        self.intro_ack = False
+        self.profile = empty_profile()
+        self.messages: List[Dict[str, Any]] = [{"role": "assistant", "content": LANGUAGE_PROMPT}]
+        self.current_field: Optional[str] = None
+        self.phase = "personal"
+        self.tech_start_idx = 0
+        self.asked = QuestionIndex()
+        self.ended = False
+        self.prefetcher: Optional[QuestionPrefetcher] = None
+        self.model = model or default_model()
+        self.consent = consent
+        self.complete = complete
+        self.last_active = time.monotonic()
+        self.stream_started: Optional[float] = None  # perf_counter start of a turn still streaming
+        self.journal = journal.TurnJournal(self.session_id)
+
+    @classmethod
+    def restore(cls, session_id: str, complete: Callable = try_chat_completion) -> Optional["InterviewSession"]:
+        """Rebuild a session from its turn journal, e.g. after the worker holding it died."""
+        state = journal.replay(session_id)
+        if state is None:
+            return None
+        fields = state["set"]
+        s = cls(session_id, model=fields.get("model"), consent=fields.get("consent", False), complete=complete)
+        for k in journal.FIELDS:
+            if k in fields:
+                setattr(s, k, fields[k])
+        s.messages = state["messages"] or s.messages
+        s.profile.update(state["profile"])
+        s.asked = QuestionIndex(state["asked"])
+        s.journal.seed(s, state["size"])
+        return s
+
+    def text(self, key: str) -> str:
+        return TRANSLATIONS.get(self.language, TRANSLATIONS["English"]).get(key, "")
+
+    def _reply(self, content: str) -> str:
+        self.messages.append({"role": "assistant", "content": content})
+        return content
+
+    def handle(self, user_text: str, stream: bool = False):
+        """Process one candidate message and return the assistant reply.
+
+        Returns None once the interview has ended. With stream=True a
+        technical question may come back as an iterator of text deltas
+        instead; pass the drained text to `finish_stream` to commit it. The
+        turn (its turn_seconds and its deadline) then ends in `finish_stream`.
+        """
+        self.last_active = time.monotonic()
+        started = time.perf_counter()
+        with metrics.tagged(phase=self.phase, model=self.model):
+            with resilience.deadline(resilience.TURN_DEADLINE):
+                reply = self._handle(user_text, stream)
+            if reply is None or isinstance(reply, str):
+                metrics.observe("turn_seconds", time.perf_counter() - started)
+            else:
+                self.stream_started = started
+        self.journal.record(self)
+        return reply
+
+    def _handle(self, user_text: str, stream: bool):
+        if not self.language_confirmed:
+            self.messages.append({"role": "user", "content": user_text})
+            detected = detect_language_input(user_text)
+            if not detected:
+                return self._reply(LANGUAGE_RETRY)
+            self.language = detected
+            self.language_confirmed = True
+            return self._reply(self.text("greeting"))
+
+        if self.ended:
+            return None
+        with metrics.timer("sentiment_seconds"):
+            sentiment = analyze_sentiment(user_text)
+        self.messages.append({"role": "user", "content": user_text, "sentiment": sentiment,
+                              "lang": detect_language_code(user_text)})
+        if is_end_message(user_text):
+            self.ended = True
+            self.close()
+            reply = self._reply(self.text("end"))
+            self.persist()
+            return reply
+        if self.phase == "technical":
+            self._queue_grading(user_text)
+
+        if not self.intro_ack:
+            if not any(x in user_text.lower() for x in INTRO_TRIGGERS):
+                return self._reply(self.text("wait"))
+            self.intro_ack = True
+            user_text = ""
+        reply = self._next_response(user_text, stream)
+        return self._reply(reply) if isinstance(reply, str) else reply
+
+    def _next_response(self, user_text: str, stream: bool):
+        p = self.profile
+        if self.current_field:
+            val = user_text.strip()
+            if val: p[self.current_field] = val
+            self.current_field = None
+
+        for key, text_key in PROFILE_CHECKS:
+            if not p.get(key):
+                self.current_field = key
+                return self.text(text_key)
+
+        if self.phase == "personal":
+            self.phase = "technical"
+            self.tech_start_idx = len(self.messages)
+        with metrics.tagged(phase=self.phase):
+            return self._technical_response(stream)
+
+    def _technical_response(self, stream: bool):
+        p = self.profile
+        # Tech stack is known: generate the whole question set in the background.
+        if self.prefetcher is None:
+            self.prefetcher = QuestionPrefetcher(p["tech_stack"], self.language, self.model, self.complete,
+                                                 band=difficulty_band(p["years_of_experience"]))
+
+        if len(self.asked) >= TECH_QUESTION_COUNT:
+            self.ended = True
+            self.close()
+            self.persist()
+            return self.text("end")
+
+        # Nothing prefetched yet: stream a fresh question instead of blocking on the pool.
+        if stream and not self.prefetcher.ready():
+            tech = random.choice(split_tech_stack(p["tech_stack"]))
+            tokens = self.complete(question_messages(tech, self.language), model=self.model, max_tokens=60, stream=True)
+            if tokens is not None:
+                return tokens
+
+        return self._commit_question(self.prefetcher.pop(self.asked))
+
+    def next_question_label(self) -> str:
+        return f"Q{len(self.asked) + 1}: "
+
+    def _commit_question(self, q: str) -> str:
+        self.asked.add(q)
+        return f"Q{len(self.asked)}: {q}"
+
+    def finish_stream(self, text: str) -> str:
+        """Commit a streamed question, swapping in a prefetched one if it is empty or a repeat.
+
+        Pass "" when the stream raised: a question that broke off is never committed.
+        """
+        q = text.strip()
+        started, self.stream_started = self.stream_started or time.perf_counter(), None
+        with metrics.tagged(phase=self.phase, model=self.model):
+            if not q or q in self.asked:
+                # Whatever the stream left of the turn's deadline; none left means a local question.
+                left = max(0.0, resilience.TURN_DEADLINE - (time.perf_counter() - started))
+                with resilience.deadline(left):
+                    q = self.prefetcher.pop(self.asked)
+            reply = self._reply(self._commit_question(q))
+            metrics.observe("turn_seconds", time.perf_counter() - started)
+        self.journal.record(self)
+        return reply
+
+    def _queue_grading(self, answer: str) -> None:
+        """Hand the answer to the last question to the background grader (never blocks the turn)."""
+        if not self.consent or not len(self.asked) or not answer.strip():
+            return
+        question = list(self.asked)[-1]
+        grading.get_grader().submit({
+            "session_id": self.session_id, "hashed_email": storage.hash_email(self.profile.get("email", "")),
+            "tech": grading.guess_tech(question, self.profile.get("tech_stack", "")),
+            "question": question, "answer": answer, "model": self.model,
+        })
+
+    def close(self) -> None:
+        """Stop generating questions nobody will ask (interview over, or session dropped)."""
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+
+    def persist(self) -> None:
+        if self.consent:
+            with metrics.timer("persist_seconds"):
+                storage.persist_candidate(self.session_id, self.profile, self.messages)
+
+    def visible_start(self) -> int:
+        """Index of the first message the UI should show (technical phase hides the intake)."""
+        if self.phase == "technical" and self.tech_start_idx < len(self.messages):
+            return self.tech_start_idx
+        return 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "language": self.language,
+            "phase": self.phase,
+            "ended": self.ended,
+            "questions_asked": len(self.asked),
+            "profile": {**self.profile,
+                        "email": storage.mask_email(self.profile.get("email", "")),
+                        "phone": storage.mask_phone(self.profile.get("phone", ""))},
+            "messages": self.messages,
+        }
+
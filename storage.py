@@ -1,11 +1,46 @@
+import atexit
 import json
 import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from functools import lru_cache
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Tuple
 import hashlib
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+import metrics
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+# First segment of the store; later segments are candidates.000001.jsonl, ... Compaction
+# (compaction.py) rewrites sealed segments as candidates.000001.jsonl.gz, a sequence of
+# independent gzip blocks, and later generations as candidates.000001.2.jsonl.gz.
 DATA_PATH = os.path.join(DATA_DIR, "candidates.jsonl")
+# Sidecar index: hashed_email -> (segment, offset, item) of each of that candidate's records.
+# offset is a byte offset in a plain segment and a block offset in a compressed one, where
+# item is the line within the decompressed block.
+INDEX_PATH = os.path.join(DATA_DIR, "candidates.idx.sqlite3")
+
+# Answer grades (grading.py): one line per graded answer, keyed like the candidate records.
+GRADES_PATH = os.path.join(DATA_DIR, "grades.jsonl")
+
+SEGMENT_MAX_BYTES = int(os.getenv("STORAGE_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+# "batch": fsync after every batch; "interval": at most every FSYNC_INTERVAL seconds; "never".
+FSYNC_POLICY = os.getenv("STORAGE_FSYNC", "batch")
+FSYNC_INTERVAL = float(os.getenv("STORAGE_FSYNC_INTERVAL", "1.0"))
+WRITE_QUEUE_SIZE = int(os.getenv("STORAGE_QUEUE_SIZE", "1024"))
+WRITE_BATCH_MAX = 256
+WRITE_BATCH_WINDOW = 0.05
+
+_INDEX_SCHEMA_VERSION = 2
+_local = threading.local()
+_grades_lock = threading.Lock()
+_index_ready: set = set()  # index files whose schema this process has already checked
+_SEGMENT_RE = re.compile(r"\.(\d{6})(?:\.(\d+))?\.jsonl(\.gz)?$")
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
@@ -36,7 +71,324 @@ def hash_email(email: str) -> str | None:
     return hashlib.sha256(norm.encode("utf-8")).hexdigest()
 
 
+def _stem() -> str:
+    return DATA_PATH[:-len(".jsonl")] if DATA_PATH.endswith(".jsonl") else DATA_PATH
+
+
+def is_compressed(path: str) -> bool:
+    return path.endswith(".gz")
+
+
+def segment_number(path: str) -> Tuple[int, int]:
+    """(sequence number, compaction generation) of a segment file; DATA_PATH is (0, 0)."""
+    m = _SEGMENT_RE.search(path) if path != DATA_PATH else None
+    return (int(m.group(1)), int(m.group(2) or 0)) if m else (0, 0)
+
+
+def compressed_segment_path(number: int, generation: int = 0) -> str:
+    return f"{_stem()}.{number:06d}{f'.{generation}' if generation else ''}.jsonl.gz"
+
+
+def _all_segment_files() -> Dict[int, List[Tuple[Tuple[bool, int], str]]]:
+    folder, prefix = os.path.split(_stem() + ".")
+    try:
+        names = os.listdir(folder or ".")
+    except FileNotFoundError:
+        names = []
+    files = [os.path.join(folder, n) for n in names if n.startswith(prefix) and _SEGMENT_RE.search(n)]
+    by_number: Dict[int, List[Tuple[Tuple[bool, int], str]]] = {}
+    for p in ([DATA_PATH] if os.path.exists(DATA_PATH) else []) + files:
+        number, generation = segment_number(p)
+        # A compressed rewrite supersedes the plain segment, a later generation the earlier one.
+        by_number.setdefault(number, []).append(((is_compressed(p), generation), p))
+    return by_number
+
+
+def segment_paths() -> List[str]:
+    """All live segment files of the store, oldest first."""
+    by_number = _all_segment_files()
+    return [max(by_number[n])[1] for n in sorted(by_number)]
+
+
+def superseded_paths() -> List[str]:
+    """Segment files a finished compaction has replaced; safe to delete."""
+    return [p for versions in _all_segment_files().values() for _, p in sorted(versions)[:-1]]
+
+
+def _next_segment_path(current: str) -> str:
+    return f"{_stem()}.{segment_number(current)[0] + 1:06d}.jsonl"
+
+
+@lru_cache(maxsize=1024)
+def _seq_base(path: str) -> Tuple[int, bool]:
+    return segment_number(path)[0] << 40, is_compressed(path)
+
+
+def record_seq(path: str, offset: int, item: int = 0) -> int:
+    """Store-wide order of a record: segment number, then position within the segment."""
+    base, compressed = _seq_base(path)
+    return base | (offset << 12 | item if compressed else offset)
+
+
+def iter_records(path: str, start: int = 0) -> Iterator[Tuple[int, int, bytes]]:
+    """(offset, item, line) for every complete record of a segment, from byte `start`
+    of a plain segment; compressed segments are always read whole."""
+    if is_compressed(path):
+        for block_at, data in iter_blocks(path):
+            for item, line in enumerate(data.splitlines(keepends=True)):
+                yield block_at, item, line
+        return
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                return  # partially written record; pick it up next time
+            yield pos, 0, line
+            pos += len(line)
+
+
+def iter_blocks(path: str) -> Iterator[Tuple[int, bytes]]:
+    """(file offset, decompressed data) of each gzip block of a compressed segment."""
+    with open(path, "rb") as f:
+        block_at = pos = 0
+        d, out, pending = zlib.decompressobj(31), [], b""
+        while True:
+            chunk = pending or f.read(1 << 20)
+            pending = b""
+            if not chunk:
+                return
+            out.append(d.decompress(chunk))
+            if d.eof:
+                pos += len(chunk) - len(d.unused_data)
+                yield block_at, b"".join(out)
+                block_at, pending = pos, d.unused_data
+                d, out = zlib.decompressobj(31), []
+            else:
+                pos += len(chunk)
+
+
+def _decompress_block(f, offset: int) -> bytes:
+    f.seek(offset)
+    d, out = zlib.decompressobj(31), []
+    while not d.eof:
+        chunk = f.read(64 * 1024)
+        if not chunk:
+            raise ValueError(f"truncated block at {offset} in {f.name}")
+        out.append(d.decompress(chunk))
+    return b"".join(out)
+
+
+def read_block(path: str, offset: int) -> bytes:
+    """Decompress the single block starting at `offset`."""
+    with open(path, "rb") as f:
+        return _decompress_block(f, offset)
+
+
+def open_index() -> sqlite3.Connection:
+    """Connection to the sidecar index, created (or rebuilt after a schema change) on demand."""
+    ready = INDEX_PATH in _index_ready and os.path.exists(INDEX_PATH)
+    conn = sqlite3.connect(INDEX_PATH, timeout=10)
+    if ready:
+        return conn
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _INDEX_SCHEMA_VERSION:
+        conn.execute("DROP TABLE IF EXISTS latest")
+        conn.execute("DROP TABLE IF EXISTS records")
+        conn.execute("DROP TABLE IF EXISTS meta")
+        conn.execute("DROP TABLE IF EXISTS segments")
+        conn.execute(f"PRAGMA user_version = {_INDEX_SCHEMA_VERSION}")
+    conn.execute("PRAGMA journal_mode = WAL")  # compaction reads must not hold up the writer
+    conn.execute("CREATE TABLE IF NOT EXISTS records (seq INTEGER PRIMARY KEY, hashed_email TEXT NOT NULL, "
+                 "segment TEXT NOT NULL, offset INTEGER NOT NULL, item INTEGER NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS records_by_email ON records (hashed_email, seq)")
+    conn.execute("CREATE INDEX IF NOT EXISTS records_by_segment ON records (segment)")
+    conn.execute("CREATE TABLE IF NOT EXISTS segments (name TEXT PRIMARY KEY, indexed_bytes INTEGER NOT NULL)")
+    conn.commit()
+    _index_ready.add(INDEX_PATH)
+    return conn
+
+
+def _pending_segments(conn: sqlite3.Connection) -> Tuple[List[Tuple[str, int, int]], List[str]]:
+    """Segments with unindexed bytes, and indexed segments that no longer exist."""
+    indexed = dict(conn.execute("SELECT name, indexed_bytes FROM segments").fetchall())
+    out = []
+    live = set()
+    for path in segment_paths():
+        name = os.path.basename(path)
+        live.add(name)
+        size = os.path.getsize(path)
+        pos = indexed.get(name, 0)
+        if pos != size:
+            out.append((path, pos, size))
+    return out, [name for name in indexed if name not in live]
+
+
+def index_rows(path: str, start: int = 0) -> Iterator[Tuple[Tuple[int, str, str, int, int] | None, int, bytes]]:
+    """(index row or None when the record has no email, offset, line) for the records of `path`."""
+    name = os.path.basename(path)
+    for offset, item, line in iter_records(path, start):
+        try:
+            hashed = json.loads(line).get("hashed_email")
+        except Exception:
+            hashed = None
+        yield ((record_seq(path, offset, item), hashed, name, offset, item) if hashed else None), offset, line
+
+
+def _catch_up(conn: sqlite3.Connection) -> None:
+    """Index every record appended since the last call (or everything after truncation)."""
+    pending, gone = _pending_segments(conn)
+    if not pending and not gone:
+        return
+    conn.execute("BEGIN IMMEDIATE")  # re-check under the write lock
+    pending, gone = _pending_segments(conn)
+    for name in gone:  # replaced by compaction, or deleted
+        conn.execute("DELETE FROM records WHERE segment = ?", (name,))
+        conn.execute("DELETE FROM segments WHERE name = ?", (name,))
+    for path, pos, size in pending:
+        name = os.path.basename(path)
+        if pos > size or (pos and is_compressed(path)):
+            conn.execute("DELETE FROM records WHERE segment = ?", (name,))
+            pos = 0
+        batch = []
+        for row, offset, line in index_rows(path, pos):
+            if row:
+                batch.append(row)
+            pos = offset + len(line)
+            if len(batch) >= 10000:
+                conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", batch)
+                batch.clear()
+        conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", batch)
+        if is_compressed(path):
+            pos = size
+        conn.execute("INSERT OR REPLACE INTO segments VALUES (?, ?)", (name, pos))
+
+
+def update_index() -> None:
+    with closing(open_index()) as conn, conn:
+        _catch_up(conn)
+
+
+def rebuild_index() -> None:
+    with closing(open_index()) as conn, conn:
+        conn.execute("DELETE FROM records")
+        conn.execute("DELETE FROM segments")
+        conn.commit()
+        _catch_up(conn)
+
+
+class _Writer(threading.Thread):
+    """Single background appender for the candidate store.
+
+    Records queue up (bounded, so producers block instead of growing memory
+    without limit) and are written in batches with one write() per batch,
+    fsynced according to FSYNC_POLICY. Segments rotate once the active one
+    reaches SEGMENT_MAX_BYTES.
+    """
+
+    def __init__(self):
+        super().__init__(name="storage-writer", daemon=True)
+        self.queue: "queue.Queue[bytes | None]" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.stats = {"records": 0, "batches": 0, "fsyncs": 0, "rotations": 0, "errors": 0}
+        self._last_fsync = 0.0
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            batch = [item]
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW
+            stop = False
+            while len(batch) < WRITE_BATCH_MAX:
+                try:
+                    nxt = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+                metrics.observe("storage_batch_seconds", time.perf_counter() - started, {}, fsync=FSYNC_POLICY)
+            except Exception:
+                self.stats["errors"] += 1
+            finally:
+                for _ in range(len(batch) + stop):
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[bytes]) -> None:
+        segments = segment_paths()
+        path = segments[-1] if segments else DATA_PATH
+        if is_compressed(path):
+            path = _next_segment_path(path)  # never append to a compacted segment
+        data = b"".join(batch)
+        if os.path.exists(path) and os.path.getsize(path) > 0 and os.path.getsize(path) + len(data) > SEGMENT_MAX_BYTES:
+            path = _next_segment_path(path)
+            self.stats["rotations"] += 1
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            now = time.monotonic()
+            if FSYNC_POLICY == "batch" or (FSYNC_POLICY == "interval" and now - self._last_fsync >= FSYNC_INTERVAL):
+                os.fsync(f.fileno())
+                self._last_fsync = now
+                self.stats["fsyncs"] += 1
+        self.stats["records"] += len(batch)
+        self.stats["batches"] += 1
+        update_index()
+
+
+_writer: _Writer | None = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _Writer:
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = _Writer()
+            _writer.start()
+        return _writer
+
+
+def flush(timeout: float | None = None) -> bool:
+    """Block until every queued record is on disk; False if `timeout` expired first."""
+    w = _writer
+    if w is None:
+        return True
+    if timeout is None:
+        w.queue.join()
+        return True
+    deadline = time.monotonic() + timeout
+    while w.queue.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def writer_stats() -> Dict[str, int]:
+    w = _writer
+    if w is None:
+        return {"records": 0, "batches": 0, "fsyncs": 0, "rotations": 0, "errors": 0, "queued": 0}
+    return {**w.stats, "queued": w.queue.qsize()}
+
+
+@atexit.register
+def _shutdown() -> None:
+    w = _writer
+    if w is not None and w.is_alive():
+        w.queue.put(None)
+        w.join(timeout=10)
+
+
 def persist_candidate(session_id: str, profile: Dict[str, Any], chat_transcript: list[Dict[str, str]]) -> None:
+    """Queue a record for the background writer; call flush() to wait for it."""
     hashed_email = hash_email(profile.get("email", ""))
     record = {
         "session_id": session_id,
@@ -49,23 +401,104 @@ def persist_candidate(session_id: str, profile: Dict[str, Any], chat_transcript:
         },
         "transcript": chat_transcript,
     }
-    with open(DATA_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    _get_writer().queue.put(line)
+
+
+def read_record(segment: str, offset: int, item: int = 0) -> Dict[str, Any] | None:
+    path = os.path.join(os.path.dirname(DATA_PATH), segment)
+    if is_compressed(path):
+        return json.loads(read_block(path, offset).splitlines()[item])
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+
+def read_records(locations: List[Tuple[str, int, int]]) -> Iterator[Tuple[Tuple[str, int, int], Dict[str, Any] | None]]:
+    """read_record for many (segment, offset, item) locations, in file order, opening each
+    segment once and decompressing each block once. Unreadable records come back as None."""
+    folder = os.path.dirname(DATA_PATH)
+    f, f_name, block_key, lines = None, None, None, []
+    try:
+        for loc in sorted(locations):
+            segment, offset, item = loc
+            try:
+                if segment != f_name:
+                    if f is not None:
+                        f.close()
+                    f, f_name = None, None
+                    f = open(os.path.join(folder, segment), "rb")
+                    f_name = segment
+                if is_compressed(segment):
+                    if block_key != (segment, offset):
+                        block_key, lines = (segment, offset), _decompress_block(f, offset).splitlines()
+                    yield loc, json.loads(lines[item])
+                else:
+                    f.seek(offset)
+                    yield loc, json.loads(f.readline())
+            except (OSError, ValueError, IndexError):
+                yield loc, None
+    finally:
+        if f is not None:
+            f.close()
+
+
+def _reader() -> sqlite3.Connection:
+    """This thread's long-lived index connection: opening one costs more than the lookup."""
+    conns = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(INDEX_PATH)
+    if conn is None or not os.path.exists(INDEX_PATH):
+        conn = conns[INDEX_PATH] = open_index()
+    return conn
+
+
+def _lookup(hashed_email: str) -> Dict[str, Any] | None:
+    conn = _reader()
+    with conn:
+        _catch_up(conn)
+        row = conn.execute("SELECT segment, offset, item FROM records WHERE hashed_email = ? ORDER BY seq DESC LIMIT 1",
+                           (hashed_email,)).fetchone()
+    return read_record(*row) if row else None
 
 
 def load_last_profile(hashed_email: str | None) -> Dict[str, Any] | None:
-    if not hashed_email or not os.path.exists(DATA_PATH):
+    if not hashed_email or not segment_paths():
         return None
     try:
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        for line in reversed(lines):
-            try:
-                obj = json.loads(line)
-                if obj.get("hashed_email") == hashed_email:
-                    return obj.get("profile")
-            except Exception:
-                continue
+        try:
+            obj = _lookup(hashed_email)
+        except FileNotFoundError:
+            obj = _lookup(hashed_email)  # compaction replaced the segment between query and read
+        if obj is not None and obj.get("hashed_email") != hashed_email:
+            # The store was rewritten underneath the index; rebuild once and retry.
+            rebuild_index()
+            obj = _lookup(hashed_email)
+        return obj.get("profile") if obj else None
     except Exception:
         return None
-    return None
+
+
+def persist_grades(grades: List[Dict[str, Any]]) -> None:
+    """Append graded answers ({"session_id", "hashed_email", "question", "score", ...}) to GRADES_PATH."""
+    if not grades:
+        return
+    data = "".join(json.dumps(g, ensure_ascii=False) + "\n" for g in grades).encode("utf-8")
+    with _grades_lock, open(GRADES_PATH, "ab") as f:
+        f.write(data)
+
+
+def load_grades(session_id: str | None = None, hashed_email: str | None = None) -> List[Dict[str, Any]]:
+    """Grades of one interview or one candidate (all grades when both are None), oldest first."""
+    if not os.path.exists(GRADES_PATH):
+        return []
+    out = []
+    with open(GRADES_PATH, "rb") as f:
+        for line in f:
+            try:
+                g = json.loads(line)
+            except ValueError:
+                continue
+            if (session_id is None or g.get("session_id") == session_id) and \
+                    (hashed_email is None or g.get("hashed_email") == hashed_email):
+                out.append(g)
+    return out
@@ -0,0 +1,328 @@
+"""Tech-stack canonicalization.
+
+    >>> parse_stack("React Native, nodejs / Postgres and k8s")
+    ('React Native', 'Node.js', 'PostgreSQL', 'Kubernetes')
+
+Free text is tokenized and matched against a trie of alias phrases
+(longest match wins, so "React Native" is one technology, not two). The
+text is read as a list of items, split at punctuation and "and"/"or".
+Aliases that are also ordinary words ("go", "rest", "shell") only count
+when the rest of their item is filler ("I use Go", "Python Go Rust", but
+not "ready to go"). In an item without any technology the remaining
+words, minus filler such as "I know" or "years", are kept as written
+(up to three), so unknown technologies survive. Results are memoized, so re-parsing a profile's stack is a dictionary lookup. Extra
+aliases can be supplied as JSON ({"Canonical": ["alias", ...]}) through
+TECH_ALIASES_PATH.
+
+`tech_key` is the lower-case form used for cache keys, the question bank
+and analytics, so they all agree on what a technology is called.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# "Canonical: alias, alias" - the canonical name is an alias of itself.
+_ALIASES = """
+Python: python3, python 3, py, cpython
+Django: django rest framework, drf
+Flask
+FastAPI: fast api
+Pandas
+NumPy
+SciPy
+scikit-learn: sklearn, scikit learn
+PyTorch: torch
+TensorFlow: tf, tensor flow
+Keras
+Jupyter: jupyter notebook, ipython
+Celery
+SQLAlchemy
+Pydantic
+Streamlit
+JavaScript: js, javascript es6, es6, ecmascript, vanilla js
+TypeScript: ts
+Node.js: node, nodejs, node js
+Deno
+Bun
+Express: express.js, expressjs
+NestJS: nest.js, nest
+React: react.js, reactjs
+React Native: react-native, rn
+Next.js: nextjs, next
+Vue.js: vue, vuejs, vue 3
+Nuxt: nuxt.js, nuxtjs
+Angular: angularjs, angular.js
+Svelte: sveltekit
+jQuery: jquery
+Redux: redux toolkit
+GraphQL: graph ql, apollo
+HTML: html5
+CSS: css3
+Sass: scss
+Tailwind CSS: tailwind, tailwindcss
+Bootstrap
+Webpack
+Vite
+Java: java 8, java 11, java 17, jdk
+Spring: spring boot, springboot, spring framework, spring mvc
+Hibernate: jpa
+Kotlin
+Scala
+Groovy
+Gradle
+Maven
+Android: android sdk
+Swift: swiftui
+Objective-C: objc, objective c
+iOS
+Flutter
+Dart
+Xamarin
+C: ansi c
+C++: cpp, cplusplus, c plus plus
+C#: csharp, c sharp
+.NET: dotnet, .net core, dotnet core, asp.net, asp.net core
+Go: golang
+Rust: rustlang
+Ruby
+Ruby on Rails: rails, ror
+PHP
+Laravel
+Symfony
+WordPress
+Perl
+R: r language, rstats
+MATLAB
+Julia
+Haskell
+Elixir
+Erlang
+Clojure
+F#: fsharp
+Lua
+Bash: shell, shell scripting, sh, zsh
+PowerShell
+SQL: t-sql, tsql, pl/sql, plsql, ansi sql
+PostgreSQL: postgres, psql, pgsql, postgre
+MySQL
+MariaDB
+SQLite: sqlite3
+Microsoft SQL Server: sql server, mssql, ms sql
+Oracle: oracle db, oracle database
+MongoDB: mongo, mongo db
+Redis
+Cassandra: apache cassandra
+DynamoDB: dynamo, dynamo db
+Elasticsearch: elastic search, elastic, opensearch
+Neo4j
+Snowflake
+BigQuery: big query
+ClickHouse
+Kafka: apache kafka
+RabbitMQ: rabbit mq, rabbit
+Apache Spark: spark, pyspark
+Hadoop: apache hadoop, hdfs
+Airflow: apache airflow
+dbt
+Docker: docker compose, docker-compose
+Kubernetes: k8s, kube, kubectl
+Helm
+Terraform
+Ansible
+Puppet
+Chef
+Jenkins
+GitHub Actions: gh actions
+GitLab CI: gitlab ci/cd, gitlab
+CI/CD: ci cd, cicd, continuous integration
+Git: github, git flow
+Linux: unix, ubuntu, debian, centos, rhel
+Nginx
+Apache HTTP Server: apache httpd, httpd
+AWS: amazon web services, amazon aws
+AWS Lambda: lambda
+Amazon S3: s3
+Amazon EC2: ec2
+Azure: microsoft azure
+Google Cloud: gcp, google cloud platform
+Firebase
+Heroku
+Vercel
+Prometheus
+Grafana
+Datadog
+Microservices: micro services, microservice
+REST: rest api, restful, rest apis, restful api
+gRPC: grpc
+WebSockets: websocket
+OAuth: oauth2, oauth 2
+Machine Learning: ml, machine-learning
+Deep Learning: dl, deep-learning, neural networks
+Natural Language Processing: nlp
+Computer Vision: cv, opencv
+Data Science
+Data Engineering
+LLM: llms, large language models
+LangChain
+Hugging Face: huggingface, transformers
+Power BI: powerbi
+Tableau
+Excel: microsoft excel
+Figma
+Selenium
+Cypress
+Playwright
+Jest
+pytest: py.test
+JUnit
+Unity: unity3d
+Unreal Engine: unreal, ue5
+Solidity
+Blockchain: web3
+"""
+
+# Aliases that are also ordinary English words or abbreviations.
+_AMBIGUOUS = {
+    "go", "next", "nest", "rest", "shell", "sh", "cv", "lambda", "express", "spark", "rabbit", "elastic", "dynamo",
+    "chef", "puppet", "unity", "swift", "spring", "bootstrap", "excel", "jest", "bun", "rails", "unreal", "apollo",
+    "transformers", "oracle", "c", "r", "rn", "ts", "tf", "py", "ml", "dl", "kube", "node",
+}
+# Words that end one item of the list.
+_ITEM_WORDS = {"and", "or", "plus", "also", "etc", "&"}
+# Words that separate technologies rather than name one.
+_SEPARATOR_WORDS = {"with", "in", "using", "the", "a", "an", "some", "of"}
+# Words around a technology that are not part of its name.
+_FILLER_WORDS = frozenset("""
+    i m ve d ll am me my we our is are was been be have has had do did does can know knows knew use used uses
+    work worked working works experience experienced expertise familiar proficient skilled good great strong
+    at on to for from by as like love mostly mainly primarily currently bit little lot lots
+    basic basics advanced intermediate expert knowledge year years yr yrs month months stuff things
+    developer development engineer engineering programming coding software
+    tools tool technologies technology tech stack languages language frameworks framework
+""".split())
+MAX_UNKNOWN_WORDS = 3
+_TOKEN_RE = re.compile(r"[,;/|\n()]|[\w.+#-]+|&")
+_VERSION_RE = re.compile(r"^v?\d+(\.\d+)*$")
+_WORD_RE = re.compile(r"\w")
+
+_lock = threading.Lock()
+_trie: Optional[Dict] = None
+_END = "\0"
+
+
+def _alias_table() -> Dict[str, List[str]]:
+    table: Dict[str, List[str]] = {}
+    for line in _ALIASES.strip().splitlines():
+        name, _, rest = line.partition(":")
+        table[name.strip()] = [a.strip() for a in rest.split(",") if a.strip()]
+    path = os.getenv("TECH_ALIASES_PATH")
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for name, aliases in json.load(f).items():
+                table.setdefault(name, []).extend(aliases)
+    return table
+
+
+def _norm(tok: str) -> str:
+    tok = tok.lower()
+    # Keep a leading dot on names like ".net"; otherwise drop stray sentence punctuation.
+    return tok if tok[:1] == "." and tok[1:].isalpha() else tok.strip(".-")
+
+
+def _tokens(text: str) -> List[str]:
+    return [_norm(t) for t in _TOKEN_RE.findall(text)]
+
+
+def _build() -> Dict:
+    trie: Dict = {}
+    for name, aliases in _alias_table().items():
+        for phrase in [name] + aliases:
+            node = trie
+            for tok in _tokens(phrase) or [phrase.lower()]:
+                node = node.setdefault(tok, {})
+            node[_END] = (name, " ".join(_tokens(phrase)) in _AMBIGUOUS)
+    return trie
+
+
+def _get_trie() -> Dict:
+    global _trie
+    if _trie is None:
+        with _lock:
+            if _trie is None:
+                _trie = _build()
+    return _trie
+
+
+@lru_cache(maxsize=8192)
+def parse_stack(text: str) -> Tuple[str, ...]:
+    """Canonical technologies mentioned in `text`, in order of first mention, without repeats."""
+    if not text:
+        return ()
+    trie = _get_trie()
+    raw = _TOKEN_RE.findall(text)
+    toks = _tokens(text)
+    out: Dict[str, None] = {}
+    matches: List[Tuple[str, bool]] = []  # (name, ambiguous) found in the current item
+    runs: List[List[str]] = [[]]  # its other words, split at separator words
+    content = 0  # its words that are neither filler, separators nor part of a match
+
+    def end_item():
+        nonlocal content
+        for name, ambiguous in matches:
+            if not ambiguous or not content:
+                out.setdefault(name, None)
+        if not matches:
+            for run in runs:
+                words = [w for w in run if w.lower() not in _FILLER_WORDS]
+                if 0 < len(words) <= MAX_UNKNOWN_WORDS:
+                    out.setdefault(" ".join(words), None)
+        matches.clear()
+        runs[:] = [[]]
+        content = 0
+
+    i = 0
+    while i < len(toks):
+        tok = toks[i]
+        if tok in _ITEM_WORDS or (tok and not _WORD_RE.search(tok) and tok not in trie):
+            end_item()
+            i += 1
+            continue
+        if not tok or tok in _SEPARATOR_WORDS:
+            runs.append([])
+            i += 1
+            continue
+        # Longest alias phrase starting here.
+        node, match, j = trie, None, i
+        while j < len(toks) and toks[j] in node:
+            node = node[toks[j]]
+            j += 1
+            if _END in node:
+                match = (node[_END], j)
+        if match:
+            matches.append(match[0])
+            runs.append([])
+            i = match[1]
+        elif _VERSION_RE.match(tok):
+            i += 1  # "Python 3.11", "Vue 3": the version is not a technology
+        else:
+            runs[-1].append(raw[i].strip(".-"))
+            content += tok not in _FILLER_WORDS
+            i += 1
+    end_item()
+    return tuple(out)
+
+
+@lru_cache(maxsize=8192)
+def canonicalize(tech: str) -> str:
+    """Canonical name of a single technology; unknown names come back trimmed."""
+    found = parse_stack(tech or "")
+    return found[0] if len(found) == 1 else " ".join((tech or "").split())
+
+
+def tech_key(tech: str) -> str:
+    """Lower-case canonical name, for cache keys, indexes and analytics."""
+    return canonicalize(tech).lower()
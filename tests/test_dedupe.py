@@ -0,0 +1,46 @@
+import pytest
+
+from dedupe import DEFAULT_THRESHOLD, QuestionIndex, jaccard, shingles
+
+NEAR_DUPLICATES = [
+    ("What is the difference between a list and a tuple in Python?",
+     "Explain the difference between lists and tuples in Python."),
+    ("Q2: What is a Kubernetes pod?", "What's a Kubernetes Pod?"),
+    ("How do you handle state management in React?",
+     "How would you handle state management in a React application?"),
+    ("What are Python decorators and how do you use them?",
+     "What is a decorator in Python and how would you use one?"),
+    ("Explain how indexes work in PostgreSQL.", "How do indexes work in PostgreSQL?"),
+]
+
+DISTINCT = [
+    ("What is a Kubernetes pod?", "What is a Kubernetes service?"),
+    ("What is the difference between a list and a tuple in Python?",
+     "What is the difference between a process and a thread?"),
+    ("How does the GIL affect multithreading in Python?", "How does the GIL affect multithreading in Ruby?"),
+    ("How do you approach debugging in Python?", "How do you approach debugging in React?"),
+    ("What is a closure in JavaScript?", "What is a closure in Python?"),
+    ("How do you optimize a slow SQL query?", "How do you design a REST API?"),
+]
+
+
+def similarity(a: str, b: str) -> float:
+    return jaccard(shingles(a), shingles(b))
+
+
+@pytest.mark.parametrize("a,b", NEAR_DUPLICATES)
+def test_near_duplicates_are_rejected(a, b):
+    assert similarity(a, b) >= DEFAULT_THRESHOLD
+    assert b in QuestionIndex([a])
+
+
+@pytest.mark.parametrize("a,b", DISTINCT)
+def test_distinct_questions_are_kept(a, b):
+    assert similarity(a, b) < DEFAULT_THRESHOLD
+    assert b not in QuestionIndex([a])
+
+
+def test_most_novel_prefers_a_new_topic():
+    index = QuestionIndex(["What is a Kubernetes pod?"])
+    best, _ = index.most_novel(["What's a Kubernetes pod?", "What is a Kubernetes service?"])
+    assert best == "What is a Kubernetes service?"
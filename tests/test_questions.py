@@ -0,0 +1,44 @@
+import pytest
+
+import question_bank
+from questions import FALLBACK_TEMPLATES, fallback_questions, generate_unique_question
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    """No LLM, no question cache, and a bank compiled from the shipped source into tmp_path."""
+    monkeypatch.setenv("QUESTION_CACHE", "0")
+    monkeypatch.setattr(question_bank, "BANK_PATH", str(tmp_path / "question_bank.idx"))
+    monkeypatch.setattr(question_bank, "_bank", None)
+    yield lambda messages, **kw: None
+
+
+def test_every_ui_language_has_templates():
+    from ui_assets import TRANSLATIONS
+    for lang in TRANSLATIONS:
+        assert len(FALLBACK_TEMPLATES[lang]) == len(FALLBACK_TEMPLATES["English"])
+        assert all("{tech}" in t for t in FALLBACK_TEMPLATES[lang])
+
+
+def test_unknown_language_uses_english_templates():
+    assert fallback_questions("Go", "Klingon") == fallback_questions("Go")
+
+
+def test_bank_does_not_fall_back_to_english(offline):
+    bank = question_bank.get_question_bank()
+    assert bank.pick(["Python"], "English", "mid")
+    assert bank.pick(["Python"], "Spanish", "mid") is None
+
+
+@pytest.mark.parametrize("lang", ["Spanish", "French", "Hindi"])
+def test_offline_question_is_in_the_session_language(offline, lang):
+    asked = []
+    for _ in range(5):
+        q = generate_unique_question("Python, SQL", asked, lang, "stub", offline)
+        assert q in fallback_questions("Python", lang) + fallback_questions("SQL", lang)
+        asked.append(q)
+
+
+def test_english_still_prefers_the_bank(offline):
+    q = generate_unique_question("Python", [], "English", "stub", offline)
+    assert q not in fallback_questions("Python")
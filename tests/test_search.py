@@ -0,0 +1,59 @@
+import pytest
+
+from search import SearchIndex
+
+PROFILES = {
+    "a": {"years_of_experience": "5 years", "tech_stack": "Python, Django", "current_location": "Berlin",
+          "desired_positions": "Backend Engineer"},
+    "b": {"years_of_experience": "7+", "tech_stack": "Python and Kubernetes", "current_location": "Munich, Germany",
+          "desired_positions": "DevOps Engineer"},
+    "c": {"years_of_experience": "3.5 yrs", "tech_stack": "React, TypeScript", "current_location": "Berlin",
+          "desired_positions": "Frontend Developer"},
+    "d": {"years_of_experience": "5,5", "tech_stack": "Go, Kubernetes", "current_location": "London",
+          "desired_positions": "Backend Engineer"},
+    "e": {"years_of_experience": "", "tech_stack": "Python", "current_location": "Pune",
+          "desired_positions": "Data Engineer"},
+}
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    for hashed, profile in PROFILES.items():
+        index.upsert(hashed, profile)
+    return index
+
+
+def found(index, **conditions):
+    return {index.keys[doc] for doc in index.query(**conditions)}
+
+
+@pytest.mark.parametrize("conditions,expected", [
+    ({"min_years": 5}, {"a", "b", "d"}),
+    ({"min_years": 5.5}, {"b", "d"}),
+    ({"max_years": 5}, {"a", "c"}),
+    ({"min_years": 3, "max_years": 4}, {"c"}),
+])
+def test_years_in_free_text_formats(index, conditions, expected):
+    assert found(index, **conditions) == expected
+
+
+def test_boolean_conditions(index):
+    assert found(index, tech=["python"]) == {"a", "b", "e"}
+    assert found(index, tech=["Python", "k8s"]) == {"b"}
+    assert found(index, any_tech=["Django", "React"], location="berlin") == {"a", "c"}
+    assert found(index, role="backend engineer", not_tech=["golang"]) == {"a"}
+    assert found(index) == set(PROFILES)
+
+
+def test_update_retracts_old_terms(index):
+    index.upsert("a", {"years_of_experience": "1 year", "tech_stack": "Rust"})
+    assert "a" not in found(index, tech=["Python"])
+    assert found(index, tech=["Rust"], max_years=2) == {"a"}
+
+
+def test_save_and_load(index, tmp_path):
+    path = str(tmp_path / "search.idx")
+    index.save(path)
+    loaded = SearchIndex.load(path)
+    assert found(loaded, tech=["Python"], min_years=5) == {"a", "b"}
@@ -0,0 +1,31 @@
+import pytest
+
+from techstack import canonicalize, parse_stack
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("React Native, nodejs / Postgres and k8s", ("React Native", "Node.js", "PostgreSQL", "Kubernetes")),
+    ("Python, Go, Rust", ("Python", "Go", "Rust")),
+    ("Python Go Rust", ("Python", "Go", "Rust")),
+    ("I use Go", ("Go",)),
+    ("next.js and rest", ("Next.js", "REST")),
+    ("Elm, Zig", ("Elm", "Zig")),
+])
+def test_lists_of_technologies(text, expected):
+    assert parse_stack(text) == expected
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("I know Python", ("Python",)),
+    ("I have worked with React for 3 years", ("React",)),
+    ("I mostly do backend stuff in Java", ("Java",)),
+    ("I know Elm", ("Elm",)),
+    ("I am ready to go to the next level", ()),
+    ("I use shell scripts and lambda functions", ()),
+])
+def test_free_text_yields_no_filler_technologies(text, expected):
+    assert parse_stack(text) == expected
+
+
+def test_canonicalize_single_ambiguous_alias():
+    assert canonicalize("golang") == canonicalize("go") == "Go"
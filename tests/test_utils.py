@@ -0,0 +1,31 @@
+import pytest
+
+from utils import normalize_profile, parse_years
+
+
+@pytest.mark.parametrize("answer, years", [
+    ("5", 5.0),
+    ("5,5", 5.5),
+    ("7+", 7.0),
+    ("3.5 yrs", 3.5),
+    ("about 5 years", 5.0),
+    ("I have 10 years of experience", 10.0),
+    ("around 2.5", 2.5),
+    ("five", 5.0),
+    ("Five years", 5.0),
+    ("roughly twelve years", 12.0),
+    (4, 4.0),
+    (0, 0.0),
+])
+def test_parse_years(answer, years):
+    assert parse_years(answer) == years
+
+
+@pytest.mark.parametrize("answer", ["", None, "none yet", "a lot", "since 2015", -1, True, "someone"])
+def test_parse_years_without_a_number(answer):
+    assert parse_years(answer) is None
+
+
+def test_normalize_profile_keeps_unparseable_answers():
+    assert normalize_profile({"years_of_experience": " about 3 years "})["years_of_experience"] == 3.0
+    assert normalize_profile({"years_of_experience": "a lot"})["years_of_experience"] == "a lot"
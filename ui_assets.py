@@ -0,0 +1,147 @@
+"""Static UI text and styling, built once per process instead of on every rerun."""
+
+TRANSLATIONS = {
+    "English": {
+        "greeting": "Hello! I’m TalentScout. I’ll collect a few details and then conduct a technical assessment. Say **bye** to exit.\n\n**Shall we start?**",
+        "q_name": "First, what is your full name?",
+        "q_email": "What is your email address?",
+        "q_phone": "What is your phone number?",
+        "q_role": "What position are you applying for?",
+        "q_yoe": "How many years of experience do you have?",
+        "q_loc": "Where are you currently located?",
+        "q_stack": "Finally, please list your Tech Stack (e.g., Python, SQL, React).",
+        "end": "Thank you! The interview is complete. A recruiter will be in touch.",
+        "wait": "Okay, standing by. Type **'start'** when ready.",
+        "download": "📥 Download Transcript"
+    },
+    "Spanish": {
+        "greeting": "¡Hola! Soy TalentScout. Recopilaré algunos detalles y haré una evaluación técnica. Di **adiós** para salir.\n\n**¿Empezamos?**",
+        "q_name": "Primero, ¿cuál es tu nombre completo?",
+        "q_email": "¿Cuál es tu correo electrónico?",
+        "q_phone": "¿Cuál es tu número de teléfono?",
+        "q_role": "¿A qué puesto estás aplicando?",
+        "q_yoe": "¿Cuántos años de experiencia tienes?",
+        "q_loc": "¿Dónde te encuentras actualmente?",
+        "q_stack": "Finalmente, lista tu Tech Stack (ej. Python, SQL, React).",
+        "end": "¡Gracias! La entrevista ha terminado. Un reclutador te contactará.",
+        "wait": "Bien, espera. Escribe **'empezar'** cuando estés listo.",
+        "download": "📥 Descargar Transcripción"
+    },
+    "French": {
+        "greeting": "Bonjour! Je suis TalentScout. Je vais recueillir quelques détails puis effectuer une évaluation technique. Dites **au revoir** pour quitter.\n\n**On commence?**",
+        "q_name": "Tout d'abord, quel est votre nom complet?",
+        "q_email": "Quel est votre adresse email?",
+        "q_phone": "Quel est votre numéro de téléphone?",
+        "q_role": "Pour quel poste postulez-vous?",
+        "q_yoe": "Combien d'années d'expérience avez-vous?",
+        "q_loc": "Où êtes-vous actuellement situé?",
+        "q_stack": "Enfin, veuillez lister votre Tech Stack (ex. Python, SQL, React).",
+        "end": "Merci! L'entretien est terminé. Un recruteur vous contactera.",
+        "wait": "D'accord. Tapez **'commencer'** quand vous êtes prêt.",
+        "download": "📥 Télécharger la transcription"
+    },
+    "Hindi": {
+        "greeting": "नमस्ते! मैं TalentScout हूँ। मैं कुछ विवरण एकत्र करूँगा और फिर तकनीकी मूल्यांकन करूँगा। बाहर निकलने के लिए **bye** कहें।\n\n**क्या हम शुरू करें?**",
+        "q_name": "सबसे पहले, आपका पूरा नाम क्या है?",
+        "q_email": "आपका ईमेल पता क्या है?",
+        "q_phone": "आपका फोन नंबर क्या है?",
+        "q_role": "आप किस पद के लिए आवेदन कर रहे हैं?",
+        "q_yoe": "आपके पास कितने साल का अनुभव है?",
+        "q_loc": "आप वर्तमान में कहाँ स्थित हैं?",
+        "q_stack": "अंत में, कृपया अपनी Tech Stack बताएं (जैसे Python, SQL, React)।",
+        "end": "धन्यवाद! साक्षात्कार पूरा हो गया है। एक रिक्रूटर आपसे संपर्क करेगा।",
+        "wait": "ठीक है। तैयार होने पर **'start'** टाइप करें।",
+        "download": "📥 ट्रांसक्रिप्ट डाउनलोड करें"
+    }
+}
+
+CSS = """
+<style>
+  @keyframes twinkle {0%,100%{opacity:.8}50%{opacity:.3}}
+  @keyframes shoot { 0% { transform: rotate(45deg) translateX(0); opacity: 0; } 15% { opacity: 1; } 100% { transform: rotate(45deg) translateX(120vw); opacity: 0; } }
+  
+  /* CORE TRANSPARENCY */
+  .stApp { background-color: transparent !important; }
+  header[data-testid="stHeader"] { background-color: transparent !important; }
+  div[data-testid="stBottom"] { background-color: transparent !important; border-top: none !important; }
+  
+  /* BACKGROUND ANIMATION */
+  .bg-sky { position: fixed; top: 0; left: 0; width: 100vw; height: 100vh; z-index: -1; pointer-events: none; overflow: hidden; background: linear-gradient(to bottom, #020105 0%, #0f172a 100%); }
+  .stars { position:absolute; inset:0; background-image: radial-gradient(1.5px 1.5px at 10% 10%, white 50%, transparent 51%), radial-gradient(1px 1px at 20% 80%, white 50%, transparent 51%); background-size: 550px 550px; animation: twinkle 4s ease-in-out infinite alternate; opacity: 0.8; }
+  .shooting-star { position: absolute; top: -50px; left: 20%; width: 4px; height: 4px; background: #fff; border-radius: 50%; box-shadow: 0 0 0 4px rgba(255,255,255,0.1), 0 0 0 8px rgba(255,255,255,0.1), 0 0 20px rgba(255,255,255,1); animation: shoot 7s linear infinite; opacity: 0; }
+  .shooting-star::before { content: ''; position: absolute; top: 50%; transform: translateY(-50%); width: 200px; height: 1px; background: linear-gradient(90deg, #fff, transparent); right: 1px; }
+  
+  /* --- SIDEBAR STYLING (DARK GLASS) --- */
+  [data-testid="stSidebar"] { 
+      background-color: rgba(10, 14, 23, 0.92) !important; 
+      border-right: 1px solid rgba(255,255,255,0.1);
+      backdrop-filter: blur(10px);
+  }
+  
+  /* --- INPUT FIELDS FIX (Light Background for readability) --- */
+  [data-testid="stSidebar"] input {
+      background-color: #f8fafc !important; 
+      color: #0f172a !important; 
+      border: 1px solid #cbd5e1 !important;
+  }
+  [data-testid="stSidebar"] input:focus {
+      border: 1px solid #60a5fa !important;
+      box-shadow: 0 0 0 2px rgba(96,165,250,0.4) !important;
+  }
+
+  /* --- LABELS & TEXT --- */
+  [data-testid="stSidebar"] label, [data-testid="stSidebar"] .stMarkdown, [data-testid="stSidebar"] h1, [data-testid="stSidebar"] h2, [data-testid="stSidebar"] h3 {
+      color: #f1f5f9 !important;
+  }
+  [data-testid="stSidebar"] .caption {
+      color: #94a3b8 !important;
+  }
+  /* Checkbox specific fix */
+  [data-testid="stSidebar"] .stCheckbox label {
+      color: #e5e7eb !important;
+      font-weight: 500;
+  }
+
+  /* --- SLIDER / PROGRESS BAR COLOR FIX --- */
+  div[data-testid="stProgress"] > div > div > div > div {
+      background-color: #ffffff !important;
+      box-shadow: 0 0 10px rgba(255, 255, 255, 0.5);
+  }
+  div[data-testid="stProgress"] > div > div {
+      background-color: rgba(255, 255, 255, 0.2);
+  }
+
+  /* --- TOP HEADER ICONS FIX --- */
+  header[data-testid="stHeader"] svg {
+      fill: white !important;
+      color: white !important;
+  }
+  [data-testid="stHeaderActionElements"] svg, [data-testid="stHeaderActionElements"] span {
+      fill: white !important;
+      color: white !important;
+  }
+  .stDeployButton {
+      color: white !important;
+  }
+
+  /* Chat & Chips */
+  .header-wrap { padding: 30px; border-radius: 20px; background: linear-gradient(135deg, rgba(14, 165, 233, 0.9) 0%, rgba(99, 102, 241, 0.9) 100%); backdrop-filter: blur(10px); border: 2px solid rgba(255,255,255,0.3); text-align: center; margin-bottom: 30px; box-shadow: 0 0 30px rgba(99, 102, 241, 0.5); }
+  .header-wrap.technical { background: linear-gradient(135deg, #a855f7 0%, #ec4899 100%); box-shadow: 0 0 30px rgba(236, 72, 153, 0.5); }
+  .title { font-size: 3rem; font-weight: 900; margin-bottom: 5px; color: white; text-shadow: 0 2px 10px rgba(0,0,0,0.3); }
+  .subtle { opacity: 0.95; font-size: 1.3rem; color: white; font-weight: 500; }
+  .chips-container { display: flex; flex-wrap: wrap; gap: 10px; justify-content: center; margin-top: 20px; }
+  .chip { padding: 8px 16px; border-radius: 50px; background: rgba(255,255,255,0.1); border: 1px solid rgba(255,255,255,0.2); font-size: 1rem; color: white; }
+  .chip.filled { background: linear-gradient(90deg, #00c6ff, #0072ff); border: 1px solid #00c6ff; box-shadow: 0 0 15px rgba(0, 198, 255, 0.6); font-weight: bold; transform: scale(1.05); }
+
+  [data-testid="stChatMessage"] { background-color: transparent !important; border: none !important; box-shadow: none !important; padding: 0 !important; margin-bottom: 10px; overflow: visible !important; }
+  /* Updated Assistant Bubble Color to be softer */
+  .chat-bubble { padding: 1.5rem; border-radius: 18px; position: relative; display: inline-block; max-width: 100%; box-shadow: 0 4px 15px rgba(0,0,0,0.2); backdrop-filter: blur(5px); font-size: 1.1rem; line-height: 1.5; }
+  .chat-bubble.assistant { background: rgba(226, 232, 240, 0.9); color: #0f172a; border-top-left-radius: 4px; border: 1px solid rgba(255,255,255,0.8); }
+  .chat-bubble.user { background: rgba(15, 17, 42, 0.9); color: #f1f5f9; border-top-right-radius: 4px; border: 1px solid rgba(100, 150, 255, 0.3); }
+  .sent-badge { font-size: 0.75rem; padding: 3px 8px; border-radius: 8px; margin-top: 8px; display: inline-block; font-weight: bold; opacity: 0.9; }
+  .sent-positive { background-color: rgba(16, 185, 129, 0.2); color: #34d399; border: 1px solid #10b981; }
+  .sent-neutral { background-color: rgba(148, 163, 184, 0.2); color: #cbd5e1; border: 1px solid #94a3b8; }
+  .sent-negative { background-color: rgba(239, 68, 68, 0.2); color: #fca5a5; border: 1px solid #ef4444; }
+</style>
+<div class='bg-sky'><div class='stars'></div><div class='shooting-star'></div></div>
+"""
@@ -2,7 +2,16 @@ from __future__ import annotations
 import re
 from typing import Dict, Any
 
+from techstack import parse_stack
+
 END_KEYWORDS = {"bye", "exit", "quit", "stop", "end", "thank you", "thanks"}
+_NUMBER_WORDS = {
+    w: i for i, w in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen "
+        "sixteen seventeen eighteen nineteen twenty".split())
+}
+_YEARS_RE = re.compile(r"(\d+(?:[.,]\d+)?)|\b(" + "|".join(_NUMBER_WORDS) + r")\b", re.IGNORECASE)
+MAX_YEARS = 60  # anything above is a calendar year ("since 2015") or a typo, not experience
 
 
 def is_end_message(text: str) -> bool:
@@ -10,29 +19,27 @@ def is_end_message(text: str) -> bool:
     return any(kw in t for kw in END_KEYWORDS)
 
 
+def parse_years(value: Any) -> float | None:
+    """First number in a years-of-experience answer ("5,5", "7+", "about 5 years", "five");
+    None without one, or when it cannot be a number of years."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        years = float(value)
+    else:
+        m = _YEARS_RE.search(str(value or ""))
+        if m is None:
+            return None
+        years = float(m.group(1).replace(",", ".")) if m.group(1) else float(_NUMBER_WORDS[m.group(2).lower()])
+    return years if 0 <= years <= MAX_YEARS else None
+
+
 def normalize_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
     p = {k: (v.strip() if isinstance(v, str) else v) for k, v in (profile or {}).items()}
-    if p.get("years_of_experience"):
-        try:
-            p["years_of_experience"] = float(str(p["years_of_experience"]).replace(",", "."))
-        except Exception:
-            pass
+    years = parse_years(p.get("years_of_experience"))
+    if years is not None:
+        p["years_of_experience"] = years
     return p
 
 
-TECH_SEPARATORS = re.compile(r"[,/|;]+|\band\b|\+", re.IGNORECASE)
-
-
 def parse_tech_stack(text: str) -> list[str]:
-    if not text:
-        return []
-    parts = [s.strip() for s in TECH_SEPARATORS.split(text) if s.strip()]
-    # Deduplicate keeping order
-    seen = set()
-    out = []
-    for s in parts:
-        key = s.lower()
-        if key not in seen:
-            seen.add(key)
-            out.append(s)
-    return out
+    """Canonical technologies in `text` (see techstack.parse_stack), deduplicated in order."""
+    return list(parse_stack(text or ""))
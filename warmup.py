@@ -0,0 +1,43 @@
+"""Background warm-up of the lazily initialised modules.
+
+The first page only needs Streamlit; the OpenAI SDK, langdetect profiles,
+VADER lexicon and question cache are loaded on a daemon thread once that
+page has rendered, so they are usually ready before they are first used.
+"""
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+_started = False
+_lock = threading.Lock()
+timings: Dict[str, float] = {}
+
+
+def _steps() -> List[Tuple[str, Callable[[], object]]]:
+    import llm_client
+    import nlp
+    from question_bank import get_question_bank
+    from question_cache import get_question_cache
+    return [("llm_client", llm_client.warm_up), ("nlp", nlp.warm_up), ("question_cache", get_question_cache),
+            ("question_bank", get_question_bank)]
+
+
+def _run() -> None:
+    for name, fn in _steps():
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            pass
+        timings[name] = time.perf_counter() - start
+
+
+def start_background_warmup() -> None:
+    """Start the warm-up thread once per process; later calls are no-ops."""
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_run, name="warmup", daemon=True).start()